@@ -0,0 +1,156 @@
+"""
+Admission control and load shedding for the prediction endpoints
+
+Each controlled endpoint runs at most `max_concurrent` requests at once, with
+at most `max_queue` more waiting. Every request carries a deadline, taken from
+the X-Request-Deadline-Ms header (remaining budget in milliseconds, capped at
+`max_deadline`) or a default. A request is rejected immediately with 503 and
+Retry-After when the queue is full or its expected wait would exceed the
+deadline, instead of queueing until the client times out. Routes that are not
+wrapped, such as /health, never wait behind prediction traffic.
+"""
+
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, jsonify, request
+
+DEADLINE_HEADER = 'X-Request-Deadline-Ms'
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted before its deadline"""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Overloaded, retry after {retry_after}s')
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, deadline-aware wait queue"""
+
+    def __init__(self, max_concurrent=8, max_queue=32, default_deadline=2.0,
+                 max_deadline=10.0, smoothing=0.2):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.default_deadline = default_deadline
+        # Clients cannot hold a queue slot for longer than this
+        self.max_deadline = max_deadline
+        self.smoothing = smoothing
+        self.rejected = 0
+        self._active = 0
+        self._waiting = 0
+        # Moving average of service time, used to predict queueing delay
+        self._service_time = 0.01
+        self._cond = threading.Condition()
+
+    def expected_wait(self, position):
+        """Predicted queueing delay for the request at a queue position"""
+        return position / self.max_concurrent * self._service_time
+
+    def retry_after(self):
+        """Whole seconds until the current backlog should have drained"""
+        backlog = self._active + self._waiting
+        return max(1, math.ceil(self.expected_wait(backlog)))
+
+    def acquire(self, deadline):
+        """Wait for a slot until deadline (a time.monotonic() value)"""
+        with self._cond:
+            if self._active < self.max_concurrent and self._waiting == 0:
+                self._active += 1
+                return
+
+            remaining = deadline - time.monotonic()
+            if (self._waiting >= self.max_queue
+                    or self.expected_wait(self._waiting + 1) > remaining):
+                self.rejected += 1
+                raise Overloaded(self.retry_after())
+
+            self._waiting += 1
+            try:
+                while self._active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise Overloaded(self.retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._active += 1
+
+    def release(self, elapsed):
+        """Free a slot and fold the request's service time into the average"""
+        with self._cond:
+            self._active -= 1
+            self._service_time += self.smoothing * (elapsed - self._service_time)
+            self._cond.notify()
+
+    @contextmanager
+    def admit(self, deadline):
+        self.acquire(deadline)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def deadline_from_request(self):
+        """Absolute deadline from the request header, or the default budget"""
+        budget = self.default_deadline
+        value = request.headers.get(DEADLINE_HEADER)
+        if value is not None:
+            try:
+                requested = float(value) / 1000.0
+            except ValueError:
+                requested = None
+            # inf/nan would overflow Condition.wait(); ignore them like junk
+            if requested is not None and math.isfinite(requested):
+                budget = min(max(0.0, requested), self.max_deadline)
+        return time.monotonic() + budget
+
+    def limit(self, view):
+        """Decorator applying admission control to a Flask view"""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            deadline = self.deadline_from_request()
+            # Made available to the view so downstream work can honour it
+            g.deadline = deadline
+            try:
+                with self.admit(deadline):
+                    return view(*args, **kwargs)
+            except Overloaded as e:
+                response = jsonify(
+                    {'error': 'Server is overloaded, please retry later'}
+                )
+                response.status_code = 503
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+        return wrapper
+
+    def stats(self):
+        return {
+            'active': self._active,
+            'waiting': self._waiting,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'service_time_ms': self._service_time * 1000,
+            'rejected': self.rejected,
+        }
+
+
+def admission_controller_from_env(prefix='BIKE_', max_concurrent=8, max_queue=32,
+                                  default_deadline_ms=2000, max_deadline_ms=10000):
+    """Create a controller configured by <prefix>MAX_* variables"""
+    env = os.environ
+    return AdmissionController(
+        max_concurrent=int(env.get(f'{prefix}MAX_CONCURRENT', max_concurrent)),
+        max_queue=int(env.get(f'{prefix}MAX_QUEUE', max_queue)),
+        default_deadline=float(
+            env.get(f'{prefix}DEFAULT_DEADLINE_MS', default_deadline_ms)
+        ) / 1000,
+        max_deadline=float(env.get(f'{prefix}MAX_DEADLINE_MS', max_deadline_ms)) / 1000,
+    )
@@ -3,24 +3,62 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
-from sklearn.preprocessing import MinMaxScaler
 import warnings
 warnings.filterwarnings('ignore')
 import logging
+from dataset import MONTHS, SEASONS, WEEKDAYS, WEATHERS, FEATURE_SCALING
+from backends import LinearBackend, TreeEnsembleBackend, CompactLinearBackend
+from drift import DriftMonitor, load_reference_profile
+from audit import audit_logger_from_env
+from stats import HistoricalStats
+from admission import admission_controller_from_env
 app = Flask(__name__)
 
+# Version of the /model.json layout understood by static/script.js
+MODEL_FORMAT = 1
+
+# Cache lifetime for /model.json requested with the current ?v= version
+MODEL_CACHE_SECONDS = 365 * 24 * 3600
+
+REQUIRED_FIELDS = ['year', 'temperature', 'humidity', 'windspeed', 'season', 'month', 'weather', 'weekday']
+
+# Largest number of records accepted by /predict/batch
+MAX_BATCH_SIZE = int(os.environ.get('BIKE_MAX_BATCH_SIZE', 10000))
+
+def to_counts(predictions):
+    """Clamp at zero and round halves to even into int64 bike counts"""
+    # fmax maps NaN to 0 like max(0.0, nan); rint rounds halves to even
+    counts = np.rint(np.fmax(predictions, 0.0))
+    # Casting would silently wrap anything int64 cannot hold (inf included)
+    if np.any(counts >= 2.0 ** 63):
+        raise ValueError('Prediction out of range')
+    return counts.astype(np.int64)
+
 class BikeSharingPredictor:
-    def __init__(self):
-        self.model = None
-        self.scaler = MinMaxScaler()
+    def __init__(self, backend=None, compact=None):
         self.feature_columns = [
             'yr', 'temp', 'hum', 'windspeed', 'Spring', 'Winter', 
             'Jul', 'Jun', 'Aug', 'Light_rainfall', 'Thunderstrom'
         ]
-        self.load_model()
+        # Request field behind each numeric model feature
+        self.numeric_inputs = {
+            'yr': 'year', 'temp': 'temperature', 'atemp': 'temperature',
+            'hum': 'humidity', 'windspeed': 'windspeed',
+            'holiday': 'holiday', 'workingday': 'workingday'
+        }
+        # Values used when an optional field is absent
+        self.input_defaults = {'workingday': 1}
+        # Divisors bringing raw inputs into the 0-1 training range
+        self.numeric_scaling = dict(FEATURE_SCALING)
+        # Request field behind each one-hot model feature
+        self.category_fields = {
+            'season': SEASONS, 'month': MONTHS,
+            'weather': WEATHERS, 'weekday': WEEKDAYS
+        }
+        self.load_model(backend, compact)
     
-    def load_model(self):
-        """Load the trained model coefficients"""
+    def load_model(self, backend=None, compact=None):
+        """Load the trained model coefficients and the serving backend"""
         # Model coefficients from the notebook analysis
         self.coefficients = {
             'const': 0.3535,
@@ -36,6 +74,23 @@ class BikeSharingPredictor:
             'Light_rainfall': -0.045,
             'Thunderstrom': -0.203
         }
+        if backend is None:
+            # A compiled tree ensemble from train.py replaces the linear model
+            model_path = os.environ.get('BIKE_MODEL_PATH')
+            if model_path:
+                backend = TreeEnsembleBackend.load(model_path)
+            else:
+                backend = LinearBackend(self.coefficients, self.feature_columns)
+        self.backend = backend
+        # Content-derived version so logs and clients can tell models apart
+        self.version = backend.version
+        
+        # float32/int8 batch inference for linear models; BIKE_COMPACT_INFERENCE=1
+        if compact is None:
+            compact = os.environ.get('BIKE_COMPACT_INFERENCE') == '1'
+        self.compact = None
+        if compact and backend.kind == 'linear':
+            self.compact = CompactLinearBackend(backend, self.numeric_inputs)
     
     def preprocess_input(self, data):
         """Preprocess input data to match model requirements"""
@@ -75,52 +130,162 @@ class BikeSharingPredictor:
         })
         
         # Scale numeric features (using approximate scaling based on dataset ranges)
-        numeric_features = ['temp', 'atemp', 'hum', 'windspeed']
-        for feature in numeric_features:
-            if feature == 'temp' or feature == 'atemp':
-                # Temperature is typically normalized between 0-1 (assuming 0-40°C range)
-                features[feature] = features[feature] / 40.0
-            elif feature == 'hum':
-                # Humidity is already in 0-1 range
-                features[feature] = features[feature] / 100.0
-            elif feature == 'windspeed':
-                # Windspeed normalized (assuming 0-50 km/h range)
-                features[feature] = features[feature] / 50.0
+        for feature, divisor in self.numeric_scaling.items():
+            features[feature] = features[feature] / divisor
         
         return features
     
+    def encode_batch(self, records):
+        """Encode request payloads into the backend's design matrix"""
+        columns = self.backend.feature_columns
+        X = np.empty((len(records), len(columns)))
+        for j, column in enumerate(columns):
+            if column in self.numeric_inputs:
+                X[:, j] = self.numeric_feature(records, column)
+            else:
+                X[:, j] = self.onehot_feature(records, column)
+        return X
+    
+    def encode_compact(self, records):
+        """Encode payloads as a float32 numeric block and an int8 one-hot block"""
+        compact = self.compact
+        # Column-major so each feature is contiguous for the term-by-term sums
+        numeric = np.empty((len(records), len(compact.numeric_columns)),
+                           dtype=np.float32, order='F')
+        for j, column in enumerate(compact.numeric_columns):
+            # Scaled in float64, then rounded to float32 once
+            numeric[:, j] = self.numeric_feature(records, column)
+        onehot = np.empty((len(records), len(compact.onehot_columns)),
+                          dtype=np.int8, order='F')
+        for j, column in enumerate(compact.onehot_columns):
+            onehot[:, j] = self.onehot_feature(records, column)
+        return numeric, onehot
+    
+    def numeric_feature(self, records, feature):
+        """Scaled values of a numeric model feature"""
+        field = self.numeric_inputs[feature]
+        default = self.input_defaults.get(field, 0)
+        values = np.array([float(record.get(field, default)) for record in records])
+        if feature in self.numeric_scaling:
+            values /= self.numeric_scaling[feature]
+        return values
+    
+    def onehot_feature(self, records, feature):
+        """0/1 values of a one-hot model feature"""
+        field = self.category_field(feature)
+        return [record.get(field) == feature for record in records]
+    
+    def category_field(self, feature):
+        """Request field whose value a one-hot feature tests for"""
+        return next(
+            field for field, values in self.category_fields.items()
+            if feature in values
+        )
+    
     def predict(self, data):
-        """Make prediction using the linear regression model"""
+        """Make prediction using the configured model backend"""
         try:
-            # Preprocess input
-            features = self.preprocess_input(data)
+            features = self.encode_batch([data])
+            prediction = self.backend.predict_batch(features)[0]
             
-            # Calculate prediction using the linear equation
-            prediction = self.coefficients['const']
-            
-            for feature in self.feature_columns:
-                if feature in features.columns:
-                    prediction += self.coefficients[feature] * features[feature].iloc[0]
-            
-            # Convert back to actual bike count (denormalize)
-            # Assuming the model predicts normalized values, we need to scale back
-            # This is an approximation - in real scenario, you'd save the scaler
-            prediction = max(0, prediction * 1000)  # Scale factor approximation
-            
-            return round(prediction)
+            # Bike counts cannot be negative; round() rounds halves to even
+            return round(max(0.0, float(prediction)))
         
         except Exception as e:
             print(f"Error in prediction: {str(e)}")
             return 0
+    
+    def predict_batch(self, records):
+        """Predict many payloads at once; invalid values raise ValueError/TypeError"""
+        if self.compact is not None:
+            return self.predict_batch_compact(records)
+        return to_counts(self.backend.predict_batch(self.encode_batch(records)))
+    
+    def predict_batch_compact(self, records):
+        """predict_batch() in float32, with the same rounded results"""
+        # Values beyond float32 range become inf; those rows are redone below
+        with np.errstate(over='ignore', invalid='ignore'):
+            numeric, onehot = self.encode_compact(records)
+            predictions = self.compact.predict_batch(numeric, onehot)
+            
+            # Counts change at half-integers. Rows whose float32 prediction is
+            # within the error bound of one (or is not finite) are redone in float64.
+            bound = self.compact.error_bound(numeric)
+            distance = np.abs(predictions - np.floor(predictions) - np.float32(0.5))
+            uncertain = np.flatnonzero(~(distance > bound))
+        predictions = predictions.astype(np.float64)
+        if len(uncertain):
+            subset = [records[i] for i in uncertain]
+            predictions[uncertain] = self.backend.predict_batch(self.encode_batch(subset))
+        return to_counts(predictions)
+    
+    def export(self):
+        """Describe the model so clients can reproduce predict() exactly"""
+        backend = self.backend
+        if backend.kind != 'linear':
+            # Only linear models can be scored client-side
+            return {'format': MODEL_FORMAT, 'version': self.version, 'type': backend.kind}
+        
+        terms = []
+        for feature, weight in zip(backend.feature_columns, backend.weights.tolist()):
+            term = {'feature': feature, 'coefficient': weight}
+            if feature in self.numeric_inputs:
+                term['field'] = self.numeric_inputs[feature]
+                term['divisor'] = self.numeric_scaling.get(feature, 1.0)
+            else:
+                term['field'] = self.category_field(feature)
+                term['equals'] = feature
+            terms.append(term)
+        
+        return {
+            'format': MODEL_FORMAT,
+            'version': self.version,
+            'type': 'linear',
+            'intercept': backend.intercept,
+            # Terms are summed in order, after the intercept
+            'terms': terms,
+            'output': {'scale': backend.output_scale, 'min': 0, 'rounding': 'half_even'}
+        }
 
 # Initialize predictor
 predictor = BikeSharingPredictor()
 
+# Input drift monitor, compared against the day.csv training profile
+drift_monitor = DriftMonitor(reference=load_reference_profile())
+
+# Prediction audit log, enabled by setting BIKE_AUDIT_DIR
+audit_logger = audit_logger_from_env()
+
+# Grouped cnt aggregates from day.csv, computed at startup and served from memory
+historical_stats = HistoricalStats()
+
+# Concurrency limit and load shedding for prediction endpoints. Batches get
+# their own limits so their long service times never shed single requests.
+admission = admission_controller_from_env()
+batch_admission = admission_controller_from_env(
+    'BIKE_BATCH_', max_concurrent=2, max_queue=4,
+    default_deadline_ms=10000, max_deadline_ms=30000
+)
+
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return render_template('index.html', model_version=predictor.version)
+
+@app.route('/model.json')
+def model_json():
+    response = jsonify(predictor.export())
+    response.set_etag(predictor.version)
+    if request.args.get('v') == predictor.version:
+        # Versioned URL: content never changes, so cache it for good
+        response.cache_control.public = True
+        response.cache_control.max_age = MODEL_CACHE_SECONDS
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/predict', methods=['POST'])
+@admission.limit
 def predict():
     try:
         # Check if request has JSON data
@@ -137,14 +302,19 @@ def predict():
             return jsonify({'error': 'Invalid JSON data'}), 400
         
         # Validate required fields
-        required_fields = ['year', 'temperature', 'humidity', 'windspeed', 'season', 'month', 'weather', 'weekday']
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
+        # Record input distribution (processed on a background thread)
+        drift_monitor.observe(data)
+        
         # Make prediction
         prediction = predictor.predict(data)
         
+        if audit_logger is not None:
+            audit_logger.record(data, prediction, predictor.version)
+        
         return jsonify({
             'prediction': prediction,
             'status': 'success'
@@ -154,9 +324,72 @@ def predict():
         # Log actual exception and stack trace server-side
         logging.error("Error in /predict: %s", e, exc_info=True)
         return jsonify({'error': 'An internal error has occurred.'}), 500
+@app.route('/predict/batch', methods=['POST'])
+@batch_admission.limit
+def predict_batch():
+    try:
+        if not request.is_json:
+            return jsonify({'error': 'Request must be JSON'}), 400
+        
+        data = request.get_json(silent=True)
+        records = data.get('records') if isinstance(data, dict) else None
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            return jsonify({'error': 'Request must contain a list of "records"'}), 400
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} records per batch'}), 413
+        
+        for i, record in enumerate(records):
+            for field in REQUIRED_FIELDS:
+                if field not in record:
+                    return jsonify({'error': f'Missing required field: {field} (record {i})'}), 400
+        
+        for record in records:
+            drift_monitor.observe(record)
+        
+        try:
+            predictions = predictor.predict_batch(records).tolist()
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid numeric value in records'}), 400
+        
+        if audit_logger is not None:
+            for record, prediction in zip(records, predictions):
+                audit_logger.record(record, prediction, predictor.version)
+        
+        return jsonify({
+            'predictions': predictions,
+            'status': 'success'
+        })
+    
+    except Exception as e:
+        logging.error("Error in /predict/batch: %s", e, exc_info=True)
+        return jsonify({'error': 'An internal error has occurred.'}), 500
+
 @app.route('/health')
 def health():
     return jsonify({'status': 'healthy'})
 
+@app.route('/stats')
+@app.route('/stats/<group>')
+def stats(group=None):
+    snapshot = historical_stats.snapshot()
+    if snapshot is None:
+        return jsonify({'error': 'Historical data is not available'}), 503
+    
+    if group is None:
+        body, etag = snapshot.body, snapshot.etag
+    elif group in snapshot.groups:
+        body, etag = snapshot.groups[group]
+    else:
+        return jsonify({'error': f'Unknown group: {group}'}), 404
+    
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/drift')
+def drift():
+    return jsonify(drift_monitor.report())
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
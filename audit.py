@@ -0,0 +1,291 @@
+"""
+Asynchronous prediction audit log
+
+The request path only appends a (timestamp, input, output, model version)
+tuple to an in-memory ring buffer. A background writer thread drains the
+buffer in large batches and writes them to rotating NDJSON or Parquet files.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from dataset import REQUEST_FIELDS
+
+# What to do when the ring buffer is full
+POLICIES = ('drop', 'drop_oldest', 'block')
+
+# Request fields stored as numbers in the columnar sink
+NUMERIC_INPUTS = ('year', 'temperature', 'humidity', 'windspeed', 'holiday', 'workingday')
+
+
+class NDJSONSink:
+    """Writes audit records as newline-delimited JSON, rotating by size"""
+
+    extension = 'ndjson'
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.path = None
+        self._file = None
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _next_path(self):
+        self._sequence += 1
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime())
+        return os.path.join(
+            self.directory, f'audit-{stamp}-{self._sequence:04d}.{self.extension}'
+        )
+
+    def _open(self):
+        self.path = self._next_path()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, records):
+        if self._file is None:
+            self._open()
+        lines = ''.join(
+            json.dumps({
+                'timestamp': timestamp,
+                'input': data,
+                'output': output,
+                'model_version': version,
+            }, default=str) + '\n'
+            for timestamp, data, output, version in records
+        )
+        self._file.write(lines)
+        self._file.flush()
+        if self._file.tell() >= self.max_bytes:
+            self.close()
+
+    def sync(self):
+        """Called after every flush; NDJSON lines are already on disk"""
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ParquetSink(NDJSONSink):
+    """Writes audit records as Parquet row groups, rotating by rows and age
+
+    A Parquet file is unreadable until its footer is written on close, so
+    files are also closed once they are max_seconds old. That bounds what a
+    crash can lose to the records of the last max_seconds.
+    """
+
+    extension = 'parquet'
+
+    def __init__(self, directory, max_rows=1000000, max_seconds=60.0):
+        # pyarrow is optional and only needed for the columnar sink
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(directory)
+        self._pa = pa
+        self._pq = pq
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self._rows = 0
+        self._opened = 0.0
+        fields = [
+            pa.field('timestamp', pa.float64()),
+            pa.field('model_version', pa.string()),
+            pa.field('output', pa.int64()),
+        ]
+        for name in REQUEST_FIELDS.values():
+            kind = pa.float64() if name in NUMERIC_INPUTS else pa.string()
+            fields.append(pa.field(name, kind))
+        # JSON text of inputs that are not objects and so have no fields
+        fields.append(pa.field('raw_input', pa.string()))
+        self.schema = pa.schema(fields)
+
+    def _open(self):
+        self.path = self._next_path()
+        self._file = self._pq.ParquetWriter(self.path, self.schema)
+        self._rows = 0
+        self._opened = time.monotonic()
+
+    def write(self, records):
+        if self._file is None:
+            self._open()
+        columns = {
+            'timestamp': [r[0] for r in records],
+            'model_version': [r[3] for r in records],
+            'output': [r[2] for r in records],
+            'raw_input': [
+                None if isinstance(r[1], dict) else json.dumps(r[1], default=str)
+                for r in records
+            ],
+        }
+        inputs = [r[1] if isinstance(r[1], dict) else {} for r in records]
+        for name in REQUEST_FIELDS.values():
+            values = [data.get(name) for data in inputs]
+            if name in NUMERIC_INPUTS:
+                columns[name] = [_as_float(v) for v in values]
+            else:
+                columns[name] = [None if v is None else str(v) for v in values]
+        self._file.write_table(self._pa.table(columns, schema=self.schema))
+        self._rows += len(records)
+        if self._rows >= self.max_rows:
+            self.close()
+
+    def sync(self):
+        """Close the open file once it reaches max_seconds"""
+        if self._file is not None and time.monotonic() - self._opened >= self.max_seconds:
+            self.close()
+
+
+SINKS = {
+    'ndjson': NDJSONSink,
+    'parquet': ParquetSink,
+}
+
+
+class AuditLogger:
+    """Buffers prediction records and writes them from a background thread"""
+
+    def __init__(self, sink, capacity=65536, policy='drop', batch_size=4096,
+                 flush_interval=0.5, block_timeout=0.05):
+        if policy not in POLICIES:
+            raise ValueError(f'Unknown audit buffer policy: {policy}')
+        self.sink = sink
+        self.capacity = capacity
+        self.policy = policy
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        # deque append/popleft are atomic, so producers never take a lock
+        self._buffer = deque()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._thread = None
+
+    def record(self, data, output, model_version):
+        """Append a prediction to the buffer; returns False if it was dropped"""
+        if self._thread is None:
+            self._start()
+
+        if len(self._buffer) >= self.capacity:
+            if self.policy == 'drop':
+                self._count_dropped(1)
+                return False
+            if self.policy == 'drop_oldest':
+                try:
+                    self._buffer.popleft()
+                    self._count_dropped(1)
+                except IndexError:
+                    pass
+            elif not self._wait_for_space():
+                self._count_dropped(1)
+                return False
+
+        self._buffer.append((time.time(), data, output, model_version))
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _count_dropped(self, count):
+        # Drops happen on many request threads at once; += alone is not atomic
+        with self._dropped_lock:
+            self.dropped += count
+
+    def _wait_for_space(self):
+        """Backpressure: wait briefly for the writer to make room"""
+        self._wakeup.set()
+        deadline = time.monotonic() + self.block_timeout
+        while len(self._buffer) >= self.capacity:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.0005)
+        return True
+
+    def _start(self):
+        with self._write_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='audit-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything currently buffered"""
+        with self._write_lock:
+            while self._buffer:
+                batch = []
+                try:
+                    while len(batch) < self.batch_size:
+                        batch.append(self._buffer.popleft())
+                except IndexError:
+                    pass
+                try:
+                    self.sink.write(batch)
+                except Exception as e:
+                    logging.error("Audit log write failed: %s", e, exc_info=True)
+                    self._count_dropped(len(batch))
+                # Per batch: under sustained load the buffer may never empty
+                self._sync()
+            # And when idle, so old files are still closed without traffic
+            self._sync()
+
+    def _sync(self):
+        try:
+            self.sink.sync()
+        except Exception as e:
+            logging.error("Audit log sync failed: %s", e, exc_info=True)
+
+    def close(self):
+        """Stop the writer thread and flush remaining records"""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        self.sink.close()
+
+    def stats(self):
+        return {
+            'buffered': len(self._buffer),
+            'capacity': self.capacity,
+            'policy': self.policy,
+            'dropped': self.dropped,
+        }
+
+
+def audit_logger_from_env():
+    """Create the audit logger configured by BIKE_AUDIT_* variables, if any"""
+    directory = os.environ.get('BIKE_AUDIT_DIR')
+    if not directory:
+        return None
+
+    sink = SINKS[os.environ.get('BIKE_AUDIT_FORMAT', 'ndjson')](directory)
+    logger = AuditLogger(
+        sink,
+        capacity=int(os.environ.get('BIKE_AUDIT_CAPACITY', 65536)),
+        policy=os.environ.get('BIKE_AUDIT_POLICY', 'drop'),
+    )
+    atexit.register(logger.close)
+    return logger
@@ -0,0 +1,192 @@
+"""
+Model backends used by BikeSharingPredictor
+
+A backend turns an encoded design matrix (one row per request, columns named
+by `feature_columns`) into raw bike counts; the predictor clamps and rounds
+them. Backends depend only on NumPy so no training library is needed to
+serve predictions.
+"""
+
+import hashlib
+import json
+import numpy as np
+
+
+class ModelBackend:
+    """Interface implemented by all model backends"""
+
+    kind = None
+
+    def __init__(self, feature_columns, version):
+        self.feature_columns = list(feature_columns)
+        self.version = version
+
+    def predict_batch(self, X):
+        """Raw predictions for the rows of X"""
+        raise NotImplementedError
+
+
+class LinearBackend(ModelBackend):
+    """The notebook's linear regression, scaled back to bike counts"""
+
+    kind = 'linear'
+
+    def __init__(self, coefficients, feature_columns, output_scale=1000):
+        digest = hashlib.sha256(
+            json.dumps(coefficients, sort_keys=True).encode()
+        ).hexdigest()
+        super().__init__(feature_columns, f'linear-{digest[:12]}')
+        self.coefficients = coefficients
+        self.intercept = coefficients['const']
+        self.weights = np.array([coefficients[f] for f in self.feature_columns])
+        self.output_scale = output_scale
+
+    def predict_batch(self, X):
+        # Accumulate term by term (not X @ w) so every row is computed with
+        # exactly the operation order of the published model
+        prediction = np.full(len(X), self.intercept)
+        for j, weight in enumerate(self.weights):
+            prediction += weight * X[:, j]
+        return prediction * self.output_scale
+
+
+class CompactLinearBackend:
+    """float32 evaluation of a LinearBackend over compact inputs.
+
+    Rows arrive as a float32 block of numeric features and an int8 block of
+    one-hot features, about a quarter of the bytes of the float64 design
+    matrix. Predictions are float32; error_bound() gives a limit on how far
+    they can be from the float64 backend's, so callers can redo the rows
+    whose rounded count is in doubt.
+    """
+
+    # The bound counts float32 roundings (unit roundoff each): weight, input
+    # and product for a numeric term, weight for a one-hot term, one per
+    # addition and the final scaling. The margin covers second-order terms
+    # and the float64 reference's own rounding.
+    ERROR_MARGIN = 2.0
+
+    def __init__(self, backend, numeric_columns):
+        self.reference = backend
+        self.numeric_columns = [c for c in backend.feature_columns if c in numeric_columns]
+        self.onehot_columns = [c for c in backend.feature_columns if c not in numeric_columns]
+        weights = dict(zip(backend.feature_columns, backend.weights))
+        self.numeric_weights = np.array(
+            [weights[c] for c in self.numeric_columns], dtype=np.float32
+        )
+        self.onehot_weights = np.array(
+            [weights[c] for c in self.onehot_columns], dtype=np.float32
+        )
+        self.intercept = np.float32(backend.intercept)
+        self.output_scale = np.float32(backend.output_scale)
+        self.version = backend.version
+        self._roundings = self.ERROR_MARGIN * (4 * len(self.numeric_columns)
+                                               + 2 * len(self.onehot_columns) + 2)
+
+    def predict_batch(self, numeric, onehot):
+        """float32 predictions for rows split into numeric and one-hot blocks"""
+        prediction = np.full(len(numeric), self.intercept, dtype=np.float32)
+        scratch = np.empty_like(prediction)
+        for j, weight in enumerate(self.numeric_weights):
+            np.multiply(numeric[:, j], weight, out=scratch)
+            prediction += scratch
+        for j, weight in enumerate(self.onehot_weights):
+            np.multiply(onehot[:, j], weight, out=scratch)
+            prediction += scratch
+        prediction *= self.output_scale
+        return prediction
+
+    def error_bound(self, numeric):
+        """Largest difference from the float64 backend for any row of the batch"""
+        magnitude = abs(float(self.reference.intercept))
+        magnitude += float(np.abs(self.onehot_weights).sum(dtype=np.float64))
+        if len(numeric):
+            largest = np.abs(numeric).max(axis=0).astype(np.float64)
+            magnitude += float(np.abs(self.numeric_weights).astype(np.float64) @ largest)
+        unit_roundoff = float(np.finfo(np.float32).eps) / 2
+        return self._roundings * unit_roundoff * float(self.reference.output_scale) * magnitude
+
+
+class TreeEnsembleBackend(ModelBackend):
+    """Gradient-boosted trees compiled into flat node arrays.
+
+    All trees share one set of node arrays; `roots` holds each tree's root
+    index. Leaves point to themselves, so a whole batch can be pushed down
+    every tree one level at a time for `max_depth` steps. Leaf values are
+    already multiplied by the learning rate.
+    """
+
+    kind = 'tree_ensemble'
+
+    # Upper bound on (rows x trees) node indexes held at once; small enough
+    # for the working arrays to stay in cache
+    CHUNK_NODES = 1 << 15
+
+    def __init__(self, feature, threshold, left, right, value, roots,
+                 base_score, max_depth, feature_columns, version=None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.base_score = float(base_score)
+        self.max_depth = int(max_depth)
+        # Children interleaved as [right, left] so one gather picks the branch
+        self._children = np.stack([self.right, self.left], axis=1).ravel()
+        if version is None:
+            digest = hashlib.sha256()
+            for array in self._arrays().values():
+                digest.update(np.ascontiguousarray(array).tobytes())
+            digest.update(json.dumps(list(feature_columns)).encode())
+            version = f'trees-{digest.hexdigest()[:12]}'
+        super().__init__(feature_columns, version)
+
+    def _arrays(self):
+        return {
+            'feature': self.feature, 'threshold': self.threshold,
+            'left': self.left, 'right': self.right,
+            'value': self.value, 'roots': self.roots,
+        }
+
+    def predict_batch(self, X):
+        # Split points were learned on float32 inputs
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_features = X.shape[1]
+        output = np.empty(len(X))
+        step = max(1, self.CHUNK_NODES // max(1, len(self.roots)))
+        for start in range(0, len(X), step):
+            chunk = X[start:start + step]
+            flat = chunk.ravel()
+            offsets = (np.arange(len(chunk)) * n_features)[:, None]
+            node = np.broadcast_to(self.roots, (len(chunk), len(self.roots)))
+            for _ in range(self.max_depth):
+                x = flat.take(offsets + self.feature.take(node))
+                go_left = x <= self.threshold.take(node)
+                node = self._children.take(2 * node + go_left)
+            output[start:start + step] = self.base_score + self.value.take(node).sum(axis=1)
+        return output
+
+    def save(self, path):
+        """Write the compiled ensemble to an .npz file"""
+        np.savez(
+            path,
+            base_score=self.base_score,
+            max_depth=self.max_depth,
+            feature_columns=np.array(self.feature_columns),
+            version=np.array(self.version),
+            **self._arrays()
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read an ensemble written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['right'],
+                data['value'], data['roots'],
+                base_score=float(data['base_score']),
+                max_depth=int(data['max_depth']),
+                feature_columns=[str(c) for c in data['feature_columns']],
+                version=str(data['version']),
+            )
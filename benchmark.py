@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for Bike Sharing Demand Prediction Application
+Measures per-call overhead of the request path components in-process
+"""
+
+import argparse
+import json
+import tempfile
+import time
+
+SAMPLE_PAYLOAD = {
+    "year": 1,
+    "month": "Jul",
+    "weekday": "Mon",
+    "temperature": 28.0,
+    "humidity": 55.0,
+    "windspeed": 8.0,
+    "weather": "Clear",
+    "season": "Summer",
+    "holiday": 0,
+    "workingday": 1
+}
+
+def time_call(func, iterations):
+    """Return the mean wall time of func() in microseconds"""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def bench_predictor(iterations):
+    """Time a single BikeSharingPredictor.predict call"""
+    from app import predictor
+    return time_call(lambda: predictor.predict(SAMPLE_PAYLOAD), iterations)
+
+def bench_drift(iterations):
+    """Time DriftMonitor.observe on the request path"""
+    from drift import DriftMonitor
+    monitor = DriftMonitor(max_pending=iterations + 1)
+    return time_call(lambda: monitor.observe(SAMPLE_PAYLOAD), iterations)
+
+def bench_audit(iterations):
+    """Time AuditLogger.record on the request path"""
+    from audit import AuditLogger, NDJSONSink
+    with tempfile.TemporaryDirectory() as directory:
+        logger = AuditLogger(NDJSONSink(directory))
+        result = time_call(
+            lambda: logger.record(SAMPLE_PAYLOAD, 1234, 'benchmark'), iterations
+        )
+        logger.close()
+    return result
+
+def bench_endpoint(iterations):
+    """Time a full POST /predict through the Flask test client"""
+    from app import app
+    body = json.dumps(SAMPLE_PAYLOAD)
+    with app.test_client() as client:
+        return time_call(
+            lambda: client.post('/predict', data=body, content_type='application/json'),
+            iterations
+        )
+
+def batch_records(rows):
+    """Varied payloads for batch benchmarks"""
+    months = ["Jan", "Apr", "Jul", "Aug", "Oct", "Dec"]
+    return [
+        dict(SAMPLE_PAYLOAD, temperature=(i % 500) / 10.0 - 10, month=months[i % len(months)])
+        for i in range(rows)
+    ]
+
+def tree_backend():
+    """Ensemble from BIKE_MODEL_PATH, or a synthetic one of the default size"""
+    import os
+    from backends import TreeEnsembleBackend
+    if os.environ.get('BIKE_MODEL_PATH'):
+        return TreeEnsembleBackend.load(os.environ['BIKE_MODEL_PATH'])
+
+    import numpy as np
+    from sklearn.ensemble import GradientBoostingRegressor
+    from train import TREE_FEATURES, compile_gradient_boosting
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (730, len(TREE_FEATURES)))
+    y = 5000 * np.sin(3 * X[:, 3]) + 2000 * X[:, 0]
+    model = GradientBoostingRegressor(n_estimators=300, max_depth=3).fit(X, y)
+    return compile_gradient_boosting(model, TREE_FEATURES)
+
+def bench_batch(backend, rows=10000, repeats=5, compact=False):
+    """Time BikeSharingPredictor.predict_batch per row, encoding included"""
+    from app import BikeSharingPredictor
+    predictor = BikeSharingPredictor(backend=backend, compact=compact)
+    records = batch_records(rows)
+    return time_call(lambda: predictor.predict_batch(records), repeats) / rows
+
+def bench_batch_linear(iterations):
+    return bench_batch(None)
+
+def bench_batch_compact(iterations):
+    return bench_batch(None, compact=True)
+
+def bench_batch_trees(iterations):
+    return bench_batch(tree_backend())
+
+BENCHMARKS = [
+    ("predictor.predict", bench_predictor),
+    ("drift_monitor.observe", bench_drift),
+    ("audit_logger.record", bench_audit),
+    ("POST /predict", bench_endpoint),
+    ("predict_batch linear (row)", bench_batch_linear),
+    ("predict_batch compact (row)", bench_batch_compact),
+    ("predict_batch trees (row)", bench_batch_trees),
+]
+
+def run_benchmarks(iterations=1000):
+    """Run all benchmarks and return {name: microseconds per call}"""
+    return {name: bench(iterations) for name, bench in BENCHMARKS}
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--iterations', type=int, default=1000)
+    args = parser.parse_args()
+
+    print("⏱️  Bike Sharing Demand Prediction - Benchmarks")
+    print("=" * 60)
+    for name, micros in run_benchmarks(args.iterations).items():
+        print(f"   {name:<28} {micros:10.2f} µs/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+import dataset
+
+@pytest.fixture(autouse=True)
+def dataset_cache(tmp_path, monkeypatch):
+    """Keep encoded dataset caches out of the working tree."""
+    directory = tmp_path / 'dataset-cache'
+    monkeypatch.setattr(dataset, 'CACHE_DIR', str(directory))
+    return str(directory)
+
+@pytest.fixture
+def day_csv(tmp_path):
+    """Write a small synthetic day.csv in the original dataset layout."""
+    rng = np.random.default_rng(0)
+    n = 365
+    frame = pd.DataFrame({
+        'instant': np.arange(1, n + 1),
+        'dteday': ['01-01-2018'] * n,
+        'season': rng.integers(1, 5, n),
+        'yr': rng.integers(0, 2, n),
+        'mnth': rng.integers(1, 13, n),
+        'holiday': rng.integers(0, 2, n),
+        'weekday': rng.integers(0, 7, n),
+        'workingday': rng.integers(0, 2, n),
+        'weathersit': rng.integers(1, 4, n),
+        'temp': rng.uniform(5, 35, n),
+        'atemp': rng.uniform(5, 35, n),
+        'hum': rng.uniform(30, 95, n),
+        'windspeed': rng.uniform(2, 30, n),
+        'casual': rng.integers(0, 3000, n),
+        'registered': rng.integers(0, 6000, n),
+        'cnt': rng.integers(0, 9000, n),
+    })
+    path = tmp_path / 'day.csv'
+    frame.to_csv(path, index=False)
+    return str(path)
@@ -0,0 +1,217 @@
+"""
+Dataset helpers for the BoomBikes daily rental data (day.csv)
+
+load_dataset() parses and encodes day.csv once, stores the result as .npy
+files in a cache directory keyed by the file's SHA-256 and ENCODING_VERSION,
+and memory-maps them on later calls instead of re-parsing the CSV.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Location of the training data; override with BIKE_DATA_PATH
+DATA_PATH = os.environ.get('BIKE_DATA_PATH', os.path.join(_HERE, 'day.csv'))
+
+# Where encoded datasets are cached; override with BIKE_CACHE_DIR
+CACHE_DIR = os.environ.get('BIKE_CACHE_DIR', os.path.join(_HERE, '.cache', 'dataset'))
+
+# Bump whenever the remaps or the design matrix layout change
+ENCODING_VERSION = 1
+
+# Categorical remaps used in the notebook analysis (position = raw code order)
+MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+SEASONS = ('Spring', 'Summer', 'Fall', 'Winter')
+WEEKDAYS = ('Tue', 'Wed', 'Thurs', 'Fri', 'Sat', 'Sun', 'Mon')
+WEATHERS = ('Clear', 'Light_rainfall', 'Thunderstrom')
+
+# Remapped categorical columns and their labels
+CATEGORICAL_COLUMNS = {
+    'season': SEASONS,
+    'mnth': MONTHS,
+    'weekday': WEEKDAYS,
+    'weathersit': WEATHERS,
+}
+
+# Columns kept as numbers, in notebook order
+NUMERIC_COLUMNS = ('yr', 'holiday', 'workingday', 'temp', 'atemp', 'hum', 'windspeed')
+
+TARGET = 'cnt'
+
+# Divisors bringing raw inputs into the model's 0-1 feature range:
+# temperature assumes 0-40°C, humidity is a percentage and windspeed
+# assumes 0-50 km/h
+FEATURE_SCALING = {'temp': 40.0, 'atemp': 40.0, 'hum': 100.0, 'windspeed': 50.0}
+
+# Dataset column -> /predict request field
+REQUEST_FIELDS = {
+    'yr': 'year',
+    'temp': 'temperature',
+    'hum': 'humidity',
+    'windspeed': 'windspeed',
+    'season': 'season',
+    'mnth': 'month',
+    'weathersit': 'weather',
+    'weekday': 'weekday',
+    'holiday': 'holiday',
+    'workingday': 'workingday',
+}
+
+
+def load_day(path=None):
+    """Load day.csv and apply the notebook's categorical remaps"""
+    df = pd.read_csv(path or DATA_PATH)
+
+    # instant/dteday are record ids, casual + registered sum to cnt
+    df = df.drop(['instant', 'dteday', 'casual', 'registered'],
+                 axis=1, errors='ignore')
+
+    df['mnth'] = df['mnth'].map(dict(enumerate(MONTHS, start=1)))
+    df['season'] = df['season'].map(dict(enumerate(SEASONS, start=1)))
+    df['weekday'] = df['weekday'].map(dict(enumerate(WEEKDAYS)))
+    df['weathersit'] = df['weathersit'].map(dict(enumerate(WEATHERS, start=1)))
+
+    return df
+
+
+def to_request_records(df):
+    """Rename dataset columns to the field names used by /predict"""
+    columns = [c for c in REQUEST_FIELDS if c in df.columns]
+    return df[columns].rename(columns=REQUEST_FIELDS)
+
+
+def dummy_columns():
+    """One-hot columns as produced by get_dummies(drop_first=True) in the notebook"""
+    columns = []
+    for column in ('season', 'mnth', 'weathersit', 'weekday'):
+        # get_dummies orders labels alphabetically and drops the first
+        columns.extend(sorted(CATEGORICAL_COLUMNS[column])[1:])
+    return columns
+
+
+def design_columns():
+    """Column names of the encoded design matrix"""
+    return list(NUMERIC_COLUMNS) + dummy_columns()
+
+
+def encode(df):
+    """Encode a remapped frame into the design matrix X and target y"""
+    X = np.zeros((len(df), len(design_columns())), dtype=np.float64)
+    for i, column in enumerate(NUMERIC_COLUMNS):
+        X[:, i] = df[column].to_numpy(dtype=np.float64)
+
+    i = len(NUMERIC_COLUMNS)
+    for column in ('season', 'mnth', 'weathersit', 'weekday'):
+        values = df[column].to_numpy()
+        for label in sorted(CATEGORICAL_COLUMNS[column])[1:]:
+            X[:, i] = values == label
+            i += 1
+
+    y = df[TARGET].to_numpy(dtype=np.float64)
+    return X, y
+
+
+class Dataset:
+    """Prepared day.csv: remapped frame plus encoded design matrix"""
+
+    def __init__(self, arrays, key):
+        self.key = key
+        self.X = arrays['X']
+        self.y = arrays['y']
+        self.columns = design_columns()
+        self._arrays = arrays
+        self._frame = None
+
+    @property
+    def frame(self):
+        """Remapped frame as returned by load_day(), rebuilt from the cache"""
+        if self._frame is None:
+            data = {}
+            for column in NUMERIC_COLUMNS + (TARGET,):
+                data[column] = self._arrays[column]
+            for column, labels in CATEGORICAL_COLUMNS.items():
+                data[column] = pd.Categorical.from_codes(self._arrays[column], labels)
+            self._frame = pd.DataFrame(data)
+        return self._frame
+
+    def __len__(self):
+        return len(self.y)
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_arrays(df):
+    X, y = encode(df)
+    arrays = {'X': X, 'y': y}
+    for column in NUMERIC_COLUMNS + (TARGET,):
+        arrays[column] = df[column].to_numpy()
+    for column, labels in CATEGORICAL_COLUMNS.items():
+        lookup = {label: code for code, label in enumerate(labels)}
+        arrays[column] = np.array([lookup.get(v, -1) for v in df[column]], dtype=np.int8)
+    return arrays
+
+
+def _write_cache(directory, arrays, meta):
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    # Write into a scratch directory and rename so readers never see a partial cache
+    scratch = tempfile.mkdtemp(dir=parent)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(scratch, f'{name}.npy'), array)
+        with open(os.path.join(scratch, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(scratch, directory)
+    except OSError:
+        # Another process may have won the race; its cache is equivalent
+        shutil.rmtree(scratch, ignore_errors=True)
+        if not os.path.isdir(directory):
+            raise
+
+
+def _read_cache(directory):
+    with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    return {
+        name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+        for name in meta['arrays']
+    }
+
+
+def load_dataset(path=None, cache_dir=None):
+    """Prepared dataset for day.csv, parsed and encoded at most once per version"""
+    path = path or DATA_PATH
+    key = f'{file_digest(path)[:16]}-v{ENCODING_VERSION}'
+    directory = os.path.join(cache_dir or CACHE_DIR, key)
+
+    if not os.path.isfile(os.path.join(directory, 'meta.json')):
+        arrays = _to_arrays(load_day(path))
+        meta = {
+            'source': os.path.abspath(path),
+            'encoding_version': ENCODING_VERSION,
+            'columns': design_columns(),
+            'arrays': list(arrays),
+        }
+        try:
+            _write_cache(directory, arrays, meta)
+        except OSError as e:
+            # e.g. a read-only deploy: serve from memory rather than fail
+            logging.warning("Dataset cache not written to %s: %s", directory, e)
+            return Dataset(arrays, key)
+
+    return Dataset(_read_cache(directory), key)
@@ -0,0 +1,261 @@
+"""
+Streaming input drift monitor for the prediction API
+
+Every /predict payload is summarised into fixed-size sketches (histograms for
+numeric fields, frequency counters for categorical fields) which are compared
+against a reference profile built from the training data. Sketch updates run
+on a background thread in batches, and memory use does not grow with traffic.
+"""
+
+import logging
+import queue
+import threading
+import numpy as np
+
+from dataset import MONTHS, SEASONS, WEEKDAYS, WEATHERS, load_dataset, to_request_records
+
+# Numeric request fields and the value range covered by the histogram bins.
+# Values outside the range land in dedicated underflow/overflow bins.
+NUMERIC_FIELDS = {
+    'temperature': (-10.0, 40.0),
+    'humidity': (0.0, 100.0),
+    'windspeed': (0.0, 50.0),
+}
+
+# Categorical request fields and their known values; anything else is counted
+# in a single "other" bucket so unseen values cannot grow the counters.
+CATEGORICAL_FIELDS = {
+    'year': ('0', '1'),
+    'season': SEASONS,
+    'month': MONTHS,
+    'weekday': WEEKDAYS,
+    'weather': WEATHERS,
+    'holiday': ('0', '1'),
+    'workingday': ('0', '1'),
+}
+
+OTHER = '__other__'
+
+# Population stability index thresholds
+PSI_WARN = 0.1
+PSI_DRIFT = 0.25
+
+
+class StreamingHistogram:
+    """Fixed-bin histogram with underflow, overflow and invalid counters"""
+
+    def __init__(self, low, high, bins=20):
+        self.low = low
+        self.high = high
+        self.edges = np.linspace(low, high, bins + 1)
+        # [underflow, bin_0 .. bin_n-1, overflow]
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+        self.invalid = 0
+        self.total = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values):
+        """Add a batch of raw values to the histogram"""
+        numbers = np.empty(len(values), dtype=np.float64)
+        valid = np.ones(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            try:
+                numbers[i] = float(value)
+            except (TypeError, ValueError):
+                valid[i] = False
+        numbers = numbers[valid & np.isfinite(numbers)]
+
+        self.invalid += len(values) - len(numbers)
+        if len(numbers) == 0:
+            return
+
+        # searchsorted maps below-range to 0 and above-range to bins + 1
+        index = np.searchsorted(self.edges, numbers, side='right')
+        index[numbers == self.high] = len(self.edges) - 1
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+        self.total += len(numbers)
+        self.sum += float(numbers.sum())
+        low, high = float(numbers.min()), float(numbers.max())
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def distribution(self):
+        """Return the bin proportions"""
+        total = self.counts.sum()
+        return self.counts / total if total else self.counts.astype(float)
+
+    def to_dict(self):
+        return {
+            'type': 'numeric',
+            'range': [self.low, self.high],
+            'count': int(self.total),
+            'invalid': int(self.invalid),
+            'mean': self.sum / self.total if self.total else None,
+            'min': self.min,
+            'max': self.max,
+            'underflow': int(self.counts[0]),
+            'overflow': int(self.counts[-1]),
+            'histogram': self.counts[1:-1].tolist(),
+        }
+
+
+class CategoricalCounter:
+    """Frequency counter over a fixed vocabulary plus an "other" bucket"""
+
+    def __init__(self, values):
+        self.values = tuple(values) + (OTHER,)
+        self._index = {value: i for i, value in enumerate(values)}
+        self.counts = np.zeros(len(self.values), dtype=np.int64)
+
+    def update(self, values):
+        """Add a batch of raw values to the counter"""
+        other = len(self.values) - 1
+        index = [self._index.get(str(value), other) for value in values]
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def distribution(self):
+        """Return the category proportions"""
+        total = self.counts.sum()
+        return self.counts / total if total else self.counts.astype(float)
+
+    def to_dict(self):
+        return {
+            'type': 'categorical',
+            'count': int(self.counts.sum()),
+            'frequencies': dict(zip(self.values, self.counts.tolist())),
+        }
+
+
+def new_sketches(bins=20):
+    """Create an empty sketch for every monitored input field"""
+    sketches = {}
+    for field, (low, high) in NUMERIC_FIELDS.items():
+        sketches[field] = StreamingHistogram(low, high, bins)
+    for field, values in CATEGORICAL_FIELDS.items():
+        sketches[field] = CategoricalCounter(values)
+    return sketches
+
+
+def population_stability_index(expected, actual, epsilon=1e-4):
+    """PSI between two distributions over the same bins"""
+    expected = np.clip(expected, epsilon, None)
+    actual = np.clip(actual, epsilon, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def build_reference_profile(records, bins=20):
+    """Build reference sketches from a DataFrame of request-shaped records"""
+    sketches = new_sketches(bins)
+    for field, sketch in sketches.items():
+        if field in records.columns:
+            sketch.update(records[field].tolist())
+    return sketches
+
+
+def load_reference_profile(path=None, bins=20):
+    """Build the reference profile from day.csv, or None if it is unavailable"""
+    try:
+        records = to_request_records(load_dataset(path).frame)
+    except (OSError, KeyError, ValueError) as e:
+        logging.warning("Drift reference profile unavailable: %s", e)
+        return None
+    return build_reference_profile(records, bins)
+
+
+class DriftMonitor:
+    """Collects request payloads off the request thread and reports drift"""
+
+    def __init__(self, reference=None, bins=20, batch_size=256, max_pending=10000):
+        self.reference = reference
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._sketches = new_sketches(bins)
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def observe(self, data):
+        """Queue a payload for the background updater; never blocks"""
+        if not isinstance(data, dict):
+            # Only JSON objects carry fields to sketch
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._pending.put_nowait(data)
+        except queue.Full:
+            # Shedding samples keeps memory bounded under bursts; request
+            # threads drop concurrently and += alone is not atomic
+            with self._lock:
+                self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='drift-monitor', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._pending.get()]
+            batch.extend(self._drain(self.batch_size - 1))
+            try:
+                self._apply(batch)
+            except Exception:
+                # A bad batch must not stop monitoring for later requests
+                logging.exception("Drift monitor failed to apply a batch")
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _apply(self, batch):
+        with self._lock:
+            for field, sketch in self._sketches.items():
+                sketch.update([data.get(field) for data in batch])
+
+    def flush(self):
+        """Apply all queued payloads immediately in the calling thread"""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            self._apply(batch)
+
+    def report(self):
+        """Summarise live sketches and their drift against the reference"""
+        fields = {}
+        with self._lock:
+            for field, sketch in self._sketches.items():
+                entry = {'live': sketch.to_dict()}
+                if self.reference is not None and field in self.reference:
+                    reference = self.reference[field]
+                    entry['reference'] = reference.to_dict()
+                    if sketch.distribution().sum() > 0:
+                        psi = population_stability_index(
+                            reference.distribution(), sketch.distribution()
+                        )
+                        entry['psi'] = psi
+                        entry['status'] = (
+                            'drift' if psi >= PSI_DRIFT
+                            else 'warn' if psi >= PSI_WARN
+                            else 'ok'
+                        )
+                fields[field] = entry
+
+        return {
+            'reference_available': self.reference is not None,
+            'pending': self._pending.qsize(),
+            'dropped': self.dropped,
+            'fields': fields,
+        }
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Traffic capture and replay tool for the /predict endpoint
+
+Capture files use the JSON-lines layout written by the audit log: one record
+per line with "timestamp", "input", "output" and "model_version". Lines that
+are bare /predict payloads are accepted too. `capture` also reads Parquet
+audit logs (requires pyarrow).
+
+    python replay.py capture logs/audit -o requests.jsonl
+    python replay.py run requests.jsonl --rate 5 --workers 4 --save baseline.jsonl
+    python replay.py run requests.jsonl --compare baseline.jsonl
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def load_capture(path):
+    """Read a capture file into a list of request records"""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'input' not in record:
+                record = {'input': record}
+            records.append(record)
+    return records
+
+
+def load_parquet_audit(path):
+    """Read a Parquet audit log (audit.ParquetSink) into request records"""
+    import pyarrow.parquet as pq
+
+    from dataset import REQUEST_FIELDS
+
+    records = []
+    for row in pq.read_table(path).to_pylist():
+        if row.get('raw_input') is not None:
+            data = json.loads(row['raw_input'])
+        else:
+            data = {
+                name: row[name] for name in REQUEST_FIELDS.values()
+                if row.get(name) is not None
+            }
+        records.append({
+            'timestamp': row['timestamp'],
+            'input': data,
+            'output': row['output'],
+            'model_version': row['model_version'],
+        })
+    return records
+
+
+# Audit log file extensions and their readers
+READERS = {
+    '.ndjson': load_capture,
+    '.parquet': load_parquet_audit,
+}
+
+
+def capture(sources, output):
+    """Merge audit log files into a single capture file ordered by time"""
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            found = [
+                path for extension in READERS
+                for path in glob.glob(os.path.join(source, f'*{extension}'))
+            ]
+            if not found:
+                raise ValueError(f'No audit log files (*.ndjson, *.parquet) in {source}')
+            paths.extend(found)
+        else:
+            paths.append(source)
+
+    records = []
+    for path in paths:
+        reader = READERS.get(os.path.splitext(path)[1], load_capture)
+        records.extend(reader(path))
+    records.sort(key=lambda r: r.get('timestamp') or 0)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    return len(records)
+
+
+def schedule(records, rate=1.0):
+    """Send offsets in seconds; rate multiplies the original request rate.
+
+    A rate of 0, or a capture without timestamps, replays back to back.
+    """
+    timestamps = [r.get('timestamp') for r in records]
+    if not timestamps:
+        return []
+    if not rate or any(t is None for t in timestamps):
+        return [0.0] * len(records)
+    start = min(timestamps)
+    return [(t - start) / rate for t in timestamps]
+
+
+def _replay_shard(shard, start_at, threads, headers):
+    """Worker process: replay a shard against an in-process app"""
+    from app import app
+
+    local = threading.local()
+
+    def send(item):
+        index, offset, payload = item
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        scheduled = start_at + offset
+        response = local.client.post(
+            '/predict', data=json.dumps(payload),
+            content_type='application/json', headers=headers
+        )
+        finished = time.time()
+        body = response.get_data()
+        return (index, response.status_code, hashlib.sha256(body).hexdigest(),
+                body.decode('utf-8', 'replace'), finished - scheduled)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = []
+        for item in shard:
+            # Open-loop pacing: latency includes any time spent queued
+            delay = start_at + item[1] - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(send, item))
+        results = [future.result() for future in futures]
+    return results
+
+
+def replay(records, rate=1.0, workers=1, threads=1, headers=None):
+    """Replay records sharded across worker processes.
+
+    Returns per-request results ordered like the input and the wall time.
+    """
+    if not records:
+        return [], 0.0
+    offsets = schedule(records, rate)
+    items = [(i, offsets[i], r['input']) for i, r in enumerate(records)]
+    shards = [items[w::workers] for w in range(workers)]
+
+    # Give worker processes time to import the app before the clock starts
+    start_at = time.time() + (0.5 + 0.25 * workers if workers > 1 else 0.0)
+    args = [(shard, start_at, threads, headers or {}) for shard in shards if shard]
+    if workers == 1:
+        outputs = [_replay_shard(*a) for a in args]
+    else:
+        with multiprocessing.get_context().Pool(len(args)) as pool:
+            outputs = pool.starmap(_replay_shard, args)
+    elapsed = time.time() - start_at
+
+    results = [None] * len(records)
+    for output in outputs:
+        for index, status, digest, body, latency in output:
+            results[index] = {
+                'status': status, 'digest': digest, 'body': body, 'latency': latency
+            }
+    return results, elapsed
+
+
+def verify(records, results, baseline=None):
+    """Return the indexes whose responses differ from the baseline.
+
+    Without a baseline, predictions are checked against the captured outputs.
+    """
+    mismatches = []
+    for i, (record, result) in enumerate(zip(records, results)):
+        if baseline is not None:
+            if baseline[i]['digest'] != result['digest']:
+                mismatches.append(i)
+        elif 'output' in record:
+            try:
+                prediction = json.loads(result['body']).get('prediction')
+            except ValueError:
+                prediction = None
+            if prediction != record['output']:
+                mismatches.append(i)
+    return mismatches
+
+
+def summarize(results, elapsed):
+    """Throughput and latency distribution of a replay"""
+    latencies = np.array([r['latency'] for r in results]) * 1000
+    statuses = {}
+    for r in results:
+        statuses[r['status']] = statuses.get(r['status'], 0) + 1
+    summary = {
+        'requests': len(results),
+        'elapsed_s': elapsed,
+        'throughput_rps': len(results) / elapsed if elapsed > 0 else None,
+        'status_codes': statuses,
+    }
+    if len(latencies):
+        for name, q in (('p50', 50), ('p90', 90), ('p99', 99), ('max', 100)):
+            summary[f'latency_{name}_ms'] = float(np.percentile(latencies, q))
+    return summary
+
+
+def save_results(path, results):
+    with open(path, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result) + '\n')
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Capture and replay /predict traffic')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cap = commands.add_parser('capture', help='merge audit logs into a capture file')
+    cap.add_argument('sources', nargs='+', help='audit log files or directories')
+    cap.add_argument('-o', '--output', default='requests.jsonl')
+
+    run = commands.add_parser('run', help='replay a capture file')
+    run.add_argument('capture')
+    run.add_argument('--rate', type=float, default=1.0,
+                     help='multiple of the original rate (0 = as fast as possible)')
+    run.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    run.add_argument('--threads', type=int, default=4, help='concurrent requests per worker')
+    run.add_argument('--header', action='append', default=[], metavar='NAME:VALUE')
+    run.add_argument('--save', help='write per-request results for later --compare')
+    run.add_argument('--compare', help='results file from a previous run')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'capture':
+        try:
+            count = capture(args.sources, args.output)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Captured {count} requests to {args.output}")
+        return 0
+
+    records = load_capture(args.capture)
+    headers = dict(
+        (name.strip(), value.strip())
+        for name, value in (h.split(':', 1) for h in args.header)
+    )
+    print(f"🔁 Replaying {len(records)} requests at {args.rate}x "
+          f"({args.workers} workers x {args.threads} threads)")
+    results, elapsed = replay(records, args.rate, args.workers, args.threads, headers)
+
+    if args.save:
+        save_results(args.save, results)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = [json.loads(line) for line in f]
+        if len(baseline) != len(results):
+            print("❌ Baseline has a different number of requests")
+            return 1
+
+    print(json.dumps(summarize(results, elapsed), indent=2))
+
+    mismatches = verify(records, results, baseline)
+    if mismatches:
+        print(f"❌ {len(mismatches)} responses differ (first: request {mismatches[0]})")
+        return 1
+    print("✅ All responses match")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,41 @@ document.addEventListener('DOMContentLoaded', function() {
     const predictionValue = document.getElementById('predictionValue');
     const predictBtn = document.querySelector('.predict-btn');
 
+    // Client-side scoring: the linear model published at /model.json is
+    // evaluated in the browser. The server is only used when the model
+    // could not be loaded or its version is not the one this page expects.
+    const MODEL_FORMAT = 1;
+    const modelVersion = document.body.dataset.modelVersion;
+    let localModel = null;
+
+    fetch(`/model.json?v=${encodeURIComponent(modelVersion)}`)
+        .then(response => response.ok ? response.json() : null)
+        .then(model => {
+            if (model && model.format === MODEL_FORMAT && model.type === 'linear'
+                    && model.version === modelVersion) {
+                localModel = model;
+            }
+        })
+        .catch(error => console.warn('Local scoring unavailable:', error));
+
+    // Python's round() rounds halves to even; Math.round rounds them up
+    function roundHalfEven(value) {
+        const rounded = Math.round(value);
+        return (Math.abs(value % 1) === 0.5 && rounded % 2 !== 0) ? rounded - 1 : rounded;
+    }
+
+    // Mirrors BikeSharingPredictor.predict term by term
+    function scoreLocally(model, data) {
+        let prediction = model.intercept;
+        model.terms.forEach(term => {
+            const value = ('equals' in term)
+                ? (data[term.field] === term.equals ? 1 : 0)
+                : data[term.field] / term.divisor;
+            prediction += term.coefficient * value;
+        });
+        return roundHalfEven(Math.max(model.output.min, prediction * model.output.scale));
+    }
+
     // Auto-populate season based on month selection
     const monthSelect = document.getElementById('month');
     const seasonSelect = document.getElementById('season');
@@ -22,9 +57,10 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    const requiredFields = ['year', 'month', 'weekday', 'temperature', 'humidity', 'windspeed', 'weather', 'season'];
+
     // Form validation
     function validateForm() {
-        const requiredFields = ['year', 'month', 'weekday', 'temperature', 'humidity', 'windspeed', 'weather', 'season'];
         let isValid = true;
         
         requiredFields.forEach(field => {
@@ -78,6 +114,42 @@ document.addEventListener('DOMContentLoaded', function() {
         resultContainer.scrollIntoView({ behavior: 'smooth' });
     }
 
+    // Update the result in place (no animation or scrolling) for live scoring
+    function renderPrediction(prediction) {
+        resultContainer.style.display = 'block';
+        predictionValue.textContent = prediction;
+    }
+
+    function isFormComplete() {
+        return requiredFields.every(field => document.getElementById(field).value !== '');
+    }
+
+    function collectFormData() {
+        const formData = new FormData(form);
+        return {
+            year: parseInt(formData.get('year')),
+            month: formData.get('month'),
+            weekday: formData.get('weekday'),
+            temperature: parseFloat(formData.get('temperature')),
+            humidity: parseFloat(formData.get('humidity')),
+            windspeed: parseFloat(formData.get('windspeed')),
+            weather: formData.get('weather'),
+            season: formData.get('season'),
+            holiday: parseInt(formData.get('holiday')),
+            workingday: parseInt(formData.get('workingday'))
+        };
+    }
+
+    // Live predictions as inputs change, once the model is available locally
+    function updateLivePrediction() {
+        if (localModel && isFormComplete()) {
+            renderPrediction(scoreLocally(localModel, collectFormData()));
+        }
+    }
+
+    form.addEventListener('input', updateLivePrediction);
+    form.addEventListener('change', updateLivePrediction);
+
     // Show error message
     function showError(message) {
         hideLoading();
@@ -132,23 +204,17 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
         
+        const data = collectFormData();
+        
+        if (localModel) {
+            showResult(scoreLocally(localModel, data));
+            showSuccess('Prediction completed successfully!');
+            return;
+        }
+        
         showLoading();
         
         try {
-            const formData = new FormData(form);
-            const data = {
-                year: parseInt(formData.get('year')),
-                month: formData.get('month'),
-                weekday: formData.get('weekday'),
-                temperature: parseFloat(formData.get('temperature')),
-                humidity: parseFloat(formData.get('humidity')),
-                windspeed: parseFloat(formData.get('windspeed')),
-                weather: formData.get('weather'),
-                season: formData.get('season'),
-                holiday: parseInt(formData.get('holiday')),
-                workingday: parseInt(formData.get('workingday'))
-            };
-            
             const response = await fetch('/predict', {
                 method: 'POST',
                 headers: {
@@ -226,6 +292,7 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('season').value = 'Summer';
         document.getElementById('holiday').value = '0';
         document.getElementById('workingday').value = '1';
+        updateLivePrediction();
         
         showSuccess('Sample data loaded! Click "Predict Bike Demand" to see the result.');
     });
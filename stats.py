@@ -0,0 +1,153 @@
+"""
+Precomputed historical aggregates of bike rentals (cnt) from day.csv
+
+The grouped breakdowns the notebook plots (season, month, weekday, weather,
+holiday, working day; overall and by year) are computed at startup into NumPy
+arrays and serialised once, so requests are answered from memory. The source
+file is re-checked periodically and, when it changes, everything is rebuilt
+on a background thread and swapped in.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+
+from dataset import DATA_PATH, MONTHS, SEASONS, WEEKDAYS, WEATHERS, load_dataset
+
+# Dataset column -> ordered categories, keyed by the name used in responses
+GROUPS = {
+    'season': ('season', SEASONS),
+    'month': ('mnth', MONTHS),
+    # Displayed Monday first; WEEKDAYS is in raw code order, ending with Mon
+    'weekday': ('weekday', WEEKDAYS[-1:] + WEEKDAYS[:-1]),
+    'weather': ('weathersit', WEATHERS),
+    'holiday': ('holiday', (0, 1)),
+    'workingday': ('workingday', (0, 1)),
+    'year': ('yr', (0, 1)),
+}
+
+# Year slices: yr == 0, yr == 1, and both years together
+YEARS = (0, 1, 'all')
+
+STATISTICS = ('count', 'mean', 'min', 'q25', 'median', 'q75', 'max')
+
+
+def aggregate(values, codes, n_categories):
+    """Statistics of values per category code -> array (categories, statistics)"""
+    result = np.full((n_categories, len(STATISTICS)), np.nan)
+    for code in range(n_categories):
+        group = values[codes == code]
+        result[code, 0] = len(group)
+        if len(group):
+            q25, median, q75 = np.percentile(group, [25, 50, 75])
+            result[code, 1:] = (group.mean(), group.min(), q25, median, q75, group.max())
+    return result
+
+
+def compute_aggregates(df):
+    """All grouped aggregates -> {group: array (categories, years, statistics)}"""
+    cnt = df['cnt'].to_numpy(dtype=np.float64)
+    yr = df['yr'].to_numpy()
+    aggregates = {}
+    for name, (column, categories) in GROUPS.items():
+        lookup = {category: code for code, category in enumerate(categories)}
+        codes = np.array([lookup.get(v, -1) for v in df[column]])
+        slices = [yr == 0, yr == 1, np.ones(len(df), dtype=bool)]
+        aggregates[name] = np.stack(
+            [aggregate(cnt[s], codes[s], len(categories)) for s in slices], axis=1
+        )
+    return aggregates
+
+
+def _encode(payload):
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return body, hashlib.sha256(body).hexdigest()[:16]
+
+
+def _group_payload(name, values):
+    # NaN (empty groups) is not valid JSON
+    rows = np.where(np.isnan(values), None, values).tolist()
+    return {
+        'categories': list(GROUPS[name][1]),
+        'years': list(YEARS),
+        'statistics': list(STATISTICS),
+        'values': rows,
+    }
+
+
+class Snapshot:
+    """Serialised aggregates ready to be served"""
+
+    def __init__(self, aggregates, rows):
+        self.aggregates = aggregates
+        self.rows = rows
+        groups = {name: _group_payload(name, values) for name, values in aggregates.items()}
+        self.body, self.etag = _encode({'rows': rows, 'groups': groups})
+        self.groups = {
+            name: _encode(dict(payload, group=name, rows=rows))
+            for name, payload in groups.items()
+        }
+
+
+class HistoricalStats:
+    """Keeps the aggregates for a data file in memory, rebuilding on change"""
+
+    def __init__(self, path=None, check_interval=5.0):
+        self.path = path or DATA_PATH
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._signature = None
+        self._checked_at = None
+        # Held for the whole of a rebuild; requests never wait on it
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self):
+        """Rebuild the aggregates in the calling thread if the source file changed"""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        self._checked_at = time.monotonic()
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        snapshot = None
+        if signature is not None:
+            try:
+                df = load_dataset(self.path).frame
+                snapshot = Snapshot(compute_aggregates(df), len(df))
+            except (OSError, KeyError, ValueError) as e:
+                # Possibly a half-written edit: keep serving the last good
+                # snapshot and retry on the next check
+                logging.error("Failed to build historical stats: %s", e)
+                return
+        # A single assignment: readers see either the old or the new snapshot
+        self._snapshot = snapshot
+        self._signature = signature
+
+    def _refresh_and_release(self):
+        try:
+            self._refresh()
+        finally:
+            self._lock.release()
+
+    def snapshot(self):
+        """Current aggregates, or None when no data is available; never blocks"""
+        due = time.monotonic() - self._checked_at >= self.check_interval
+        if due and self._lock.acquire(blocking=False):
+            threading.Thread(
+                target=self._refresh_and_release, name='stats-refresh', daemon=True
+            ).start()
+        return self._snapshot
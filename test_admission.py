@@ -0,0 +1,189 @@
+import pytest
+import json
+import sys
+import os
+import threading
+import time
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from admission import AdmissionController, Overloaded, DEADLINE_HEADER
+from benchmark import SAMPLE_PAYLOAD
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application."""
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+class TestAdmissionController:
+    """Test cases for the admission controller."""
+
+    def test_admits_within_limit(self):
+        """Requests under the concurrency limit are admitted immediately."""
+        controller = AdmissionController(max_concurrent=2, max_queue=0)
+        deadline = time.monotonic() + 1
+        controller.acquire(deadline)
+        controller.acquire(deadline)
+        assert controller.stats()['active'] == 2
+
+        with pytest.raises(Overloaded):
+            controller.acquire(deadline)
+        controller.release(0.01)
+        controller.acquire(deadline)
+
+    def test_rejects_when_wait_exceeds_deadline(self):
+        """A request that cannot start before its deadline fails fast."""
+        controller = AdmissionController(max_concurrent=1, max_queue=10)
+        controller._service_time = 0.5
+        controller.acquire(time.monotonic() + 1)
+
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as info:
+            controller.acquire(time.monotonic() + 0.1)
+        assert time.monotonic() - started < 0.05
+        assert info.value.retry_after >= 1
+        assert controller.rejected == 1
+
+    def test_waiter_is_admitted_on_release(self):
+        """A queued request runs once a slot frees up."""
+        controller = AdmissionController(max_concurrent=1, max_queue=1)
+        controller._service_time = 0.001
+        controller.acquire(time.monotonic() + 1)
+
+        admitted = threading.Event()
+        def waiter():
+            controller.acquire(time.monotonic() + 1)
+            admitted.set()
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.02)
+        assert not admitted.is_set()
+
+        controller.release(0.001)
+        thread.join(timeout=1)
+        assert admitted.is_set()
+
+    def test_latency_bounded_under_overload(self):
+        """At 5x overload admitted requests finish near their deadline and
+        the rest are shed quickly."""
+        service_time = 0.02
+        budget = 0.1
+        controller = AdmissionController(max_concurrent=2, max_queue=8)
+        controller._service_time = service_time
+
+        # Capacity within the budget is about 2 * budget / service_time = 10
+        latencies, rejections = [], []
+        lock = threading.Lock()
+
+        def request():
+            started = time.monotonic()
+            try:
+                with controller.admit(started + budget):
+                    time.sleep(service_time)
+                with lock:
+                    latencies.append(time.monotonic() - started)
+            except Overloaded:
+                with lock:
+                    rejections.append(time.monotonic() - started)
+
+        threads = [threading.Thread(target=request) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(latencies) + len(rejections) == 50
+        assert rejections
+        assert np.percentile(latencies, 99) < budget + 5 * service_time
+        assert max(rejections) < budget + service_time
+
+class TestAdmissionEndpoint:
+    """Test cases for admission control on the Flask endpoints."""
+
+    def test_overloaded_predict_returns_503(self, client, monkeypatch):
+        """A saturated /predict sheds load with Retry-After."""
+        admission = app_module.admission
+        monkeypatch.setattr(admission, '_active', admission.max_concurrent)
+
+        response = client.post('/predict', data=json.dumps(SAMPLE_PAYLOAD),
+                               content_type='application/json',
+                               headers={DEADLINE_HEADER: '0'})
+        assert response.status_code == 503
+        assert int(response.headers['Retry-After']) >= 1
+        assert 'error' in json.loads(response.data)
+
+        # Cheap routes are not held back by prediction traffic
+        assert client.get('/health').status_code == 200
+
+    def test_deadline_header(self, client):
+        """Requests with a deadline header are served normally when idle."""
+        response = client.post('/predict', data=json.dumps(SAMPLE_PAYLOAD),
+                               content_type='application/json',
+                               headers={DEADLINE_HEADER: '250'})
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize('value', ['inf', '-inf', 'nan', '1e300', '1e400'])
+    def test_unbounded_deadline_header(self, client, monkeypatch, value):
+        """Huge or non-finite deadlines are capped, not waited on."""
+        admission = app_module.admission
+        monkeypatch.setattr(admission, '_active', admission.max_concurrent)
+        monkeypatch.setattr(admission, 'max_deadline', 0.05)
+        monkeypatch.setattr(admission, 'default_deadline', 0.05)
+
+        started = time.monotonic()
+        response = client.post('/predict', data=json.dumps(SAMPLE_PAYLOAD),
+                               content_type='application/json',
+                               headers={DEADLINE_HEADER: value})
+        assert time.monotonic() - started < 1
+        assert response.status_code == 503
+        assert 'error' in json.loads(response.data)
+
+    def test_deadline_capped_at_maximum(self):
+        """A finite budget above max_deadline is cut down to it."""
+        controller = AdmissionController(max_deadline=0.5)
+        cases = (('100', 0.1), ('60000', 0.5), ('-5', 0.0), ('inf', 2.0))
+        for value, expected in cases:
+            with app_module.app.test_request_context(headers={DEADLINE_HEADER: value}):
+                budget = controller.deadline_from_request() - time.monotonic()
+            assert expected - 0.05 < budget <= expected
+
+    def test_batches_use_separate_limits(self, client, monkeypatch):
+        """Batch traffic neither occupies nor slows /predict admission."""
+        single, batch = app_module.admission, app_module.batch_admission
+        assert single is not batch
+        service_time = single._service_time
+
+        body = json.dumps({'records': [SAMPLE_PAYLOAD] * 500})
+        response = client.post('/predict/batch', data=body,
+                               content_type='application/json')
+        assert response.status_code == 200
+        assert single._service_time == service_time
+
+        # A saturated batch controller leaves single predictions alone
+        monkeypatch.setattr(batch, '_active', batch.max_concurrent)
+        response = client.post('/predict/batch', data=body,
+                               content_type='application/json',
+                               headers={DEADLINE_HEADER: '0'})
+        assert response.status_code == 503
+        response = client.post('/predict', data=json.dumps(SAMPLE_PAYLOAD),
+                               content_type='application/json',
+                               headers={DEADLINE_HEADER: '0'})
+        assert response.status_code == 200
+
+    def test_batch_limits_from_env(self, monkeypatch):
+        """BIKE_BATCH_* variables configure the batch controller."""
+        from admission import admission_controller_from_env
+        monkeypatch.setenv('BIKE_BATCH_MAX_CONCURRENT', '3')
+        monkeypatch.setenv('BIKE_BATCH_MAX_DEADLINE_MS', '60000')
+        controller = admission_controller_from_env('BIKE_BATCH_', max_concurrent=2)
+        assert controller.max_concurrent == 3
+        assert controller.max_deadline == 60.0
+        assert admission_controller_from_env().max_concurrent == 8
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -134,6 +134,31 @@ class TestBikeSharingPredictor:
         assert isinstance(prediction, int)
         assert prediction >= 0
 
+    def test_export_reproduces_predict(self, predictor):
+        """Test that the exported model gives the same results as predict()."""
+        model = predictor.export()
+
+        def score(data):
+            prediction = model['intercept']
+            for term in model['terms']:
+                if 'equals' in term:
+                    value = 1 if data[term['field']] == term['equals'] else 0
+                else:
+                    value = data[term['field']] / term['divisor']
+                prediction += term['coefficient'] * value
+            return round(max(model['output']['min'], prediction * model['output']['scale']))
+
+        for season in ['Spring', 'Summer', 'Fall', 'Winter']:
+            for month in ['Jan', 'Jun', 'Jul', 'Aug']:
+                for weather in ['Clear', 'Light_rainfall', 'Thunderstrom']:
+                    data = {
+                        'year': 1, 'temperature': 21.3, 'humidity': 47.0,
+                        'windspeed': 13.7, 'season': season, 'month': month,
+                        'weather': weather, 'weekday': 'Wed',
+                        'holiday': 0, 'workingday': 1
+                    }
+                    assert score(data) == predictor.predict(data)
+
 class TestFlaskApp:
     """Test cases for the Flask application endpoints."""
     
@@ -150,7 +175,120 @@ class TestFlaskApp:
         
         data = json.loads(response.data)
         assert data['status'] == 'healthy'
-    
+
+    def test_predict_batch(self, client, predictor):
+        """Test the batch prediction endpoint."""
+        records = [
+            {
+                'year': 1, 'month': month, 'weekday': 'Mon',
+                'temperature': 25.0, 'humidity': 60.0, 'windspeed': 10.0,
+                'weather': 'Clear', 'season': 'Summer',
+                'holiday': 0, 'workingday': 1
+            }
+            for month in ['Jun', 'Jul', 'Aug']
+        ]
+
+        response = client.post('/predict/batch',
+                               data=json.dumps({'records': records}),
+                               content_type='application/json')
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert data['status'] == 'success'
+        assert data['predictions'] == [predictor.predict(r) for r in records]
+
+    def test_predict_batch_invalid(self, client):
+        """Test batch prediction with malformed requests."""
+        response = client.post('/predict/batch', data=json.dumps([1, 2]),
+                               content_type='application/json')
+        assert response.status_code == 400
+
+        response = client.post('/predict/batch',
+                               data=json.dumps({'records': [{'year': 1}]}),
+                               content_type='application/json')
+        assert response.status_code == 400
+        assert 'Missing required field' in json.loads(response.data)['error']
+
+        record = {
+            'year': 1, 'month': 'Jul', 'weekday': 'Mon',
+            'temperature': 'warm', 'humidity': 60.0, 'windspeed': 10.0,
+            'weather': 'Clear', 'season': 'Summer'
+        }
+        response = client.post('/predict/batch',
+                               data=json.dumps({'records': [record]}),
+                               content_type='application/json')
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize('temperature', ['1e18', '1e300', 'Infinity'])
+    def test_predict_batch_out_of_range(self, client, predictor, temperature):
+        """Counts too large for an integer are rejected, never wrapped negative."""
+        body = ('{"records": [{"year": 1, "month": "Jul", "weekday": "Mon", '
+                f'"temperature": {temperature}, "humidity": 60.0, "windspeed": 10.0, '
+                '"weather": "Clear", "season": "Summer"}]}')
+        response = client.post('/predict/batch', data=body,
+                               content_type='application/json')
+        assert response.status_code == 400
+        with pytest.raises(ValueError):
+            predictor.predict_batch([{'temperature': float(temperature)}])
+
+        # Hugely negative inputs still clamp to zero
+        assert predictor.predict_batch([{'temperature': -1e300}]).tolist() == [0]
+
+    def test_model_json_route(self, client, predictor):
+        """Test the published model and its caching headers."""
+        response = client.get('/model.json')
+        assert response.status_code == 200
+        assert response.headers['ETag'] == f'"{predictor.version}"'
+        assert 'no-cache' in response.headers['Cache-Control']
+
+        data = json.loads(response.data)
+        assert data['version'] == predictor.version
+        assert data['type'] == 'linear'
+        assert len(data['terms']) == len(predictor.feature_columns)
+
+        versioned = client.get(f'/model.json?v={predictor.version}')
+        assert 'immutable' in versioned.headers['Cache-Control']
+        assert 'max-age=' in versioned.headers['Cache-Control']
+
+        cached = client.get('/model.json', headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+
+    def test_index_embeds_model_version(self, client, predictor):
+        """Test that the page tells script.js which model version to expect."""
+        response = client.get('/')
+        assert f'data-model-version="{predictor.version}"'.encode() in response.data
+
+    def test_drift_route(self, client):
+        """Test the drift report endpoint."""
+        response = client.get('/drift')
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert 'fields' in data
+        assert 'temperature' in data['fields']
+        assert 'weather' in data['fields']
+
+    def test_drift_survives_non_object_payload(self, client, monkeypatch):
+        """A string naming every field cannot stop drift monitoring."""
+        import time
+        import app as app_module
+        from drift import DriftMonitor
+        monitor = DriftMonitor()
+        monkeypatch.setattr(app_module, 'drift_monitor', monitor)
+
+        client.post('/predict', json='year temperature humidity windspeed season month weather weekday')
+        response = client.post('/predict', json={
+            'year': 1, 'month': 'Jul', 'weekday': 'Mon', 'temperature': 25.0,
+            'humidity': 60.0, 'windspeed': 10.0, 'weather': 'Clear', 'season': 'Summer'
+        })
+        assert response.status_code == 200
+
+        deadline = time.monotonic() + 5
+        while monitor.report()['fields']['temperature']['live']['count'] < 1:
+            assert time.monotonic() < deadline, 'drift monitor stopped updating'
+            time.sleep(0.01)
+        assert monitor._thread.is_alive()
+
     def test_predict_valid_data(self, client):
         """Test prediction endpoint with valid data."""
         valid_data = {
@@ -0,0 +1,199 @@
+import pytest
+import json
+import sys
+import os
+import glob
+import threading
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audit import AuditLogger, NDJSONSink, ParquetSink
+from benchmark import SAMPLE_PAYLOAD
+
+def read_records(directory):
+    records = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.ndjson'))):
+        with open(path, encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+class TestAuditLogger:
+    """Test cases for the asynchronous audit logger."""
+
+    def test_records_are_written(self, tmp_path):
+        """Buffered records reach the NDJSON sink with all fields."""
+        logger = AuditLogger(NDJSONSink(str(tmp_path)))
+        for i in range(10):
+            assert logger.record(SAMPLE_PAYLOAD, i, 'v1')
+        logger.close()
+
+        records = read_records(str(tmp_path))
+        assert [r['output'] for r in records] == list(range(10))
+        assert records[0]['input'] == SAMPLE_PAYLOAD
+        assert records[0]['model_version'] == 'v1'
+        assert isinstance(records[0]['timestamp'], float)
+
+    def test_rotation(self, tmp_path):
+        """Files rotate once they exceed the size limit."""
+        logger = AuditLogger(NDJSONSink(str(tmp_path), max_bytes=1024), batch_size=5)
+        for i in range(50):
+            logger.record(SAMPLE_PAYLOAD, i, 'v1')
+        logger.close()
+
+        assert len(glob.glob(os.path.join(str(tmp_path), '*.ndjson'))) > 1
+        assert len(read_records(str(tmp_path))) == 50
+
+    def test_drop_policy(self, tmp_path):
+        """The drop policy rejects new records when the buffer is full."""
+        logger = AuditLogger(NDJSONSink(str(tmp_path)), capacity=3, policy='drop')
+        logger._thread = object()  # keep the writer stopped
+        results = [logger.record(SAMPLE_PAYLOAD, i, 'v1') for i in range(5)]
+
+        assert results == [True, True, True, False, False]
+        assert logger.dropped == 2
+        logger.flush()
+        assert [r['output'] for r in read_records(str(tmp_path))] == [0, 1, 2]
+
+    def test_drop_oldest_policy(self, tmp_path):
+        """The drop_oldest policy evicts the oldest buffered record."""
+        logger = AuditLogger(NDJSONSink(str(tmp_path)), capacity=3, policy='drop_oldest')
+        logger._thread = object()
+        for i in range(5):
+            assert logger.record(SAMPLE_PAYLOAD, i, 'v1')
+        logger.flush()
+
+        assert logger.dropped == 2
+        assert [r['output'] for r in read_records(str(tmp_path))] == [2, 3, 4]
+
+    def test_block_policy_times_out(self, tmp_path):
+        """The block policy gives up after its timeout if nothing drains."""
+        logger = AuditLogger(NDJSONSink(str(tmp_path)), capacity=1,
+                             policy='block', block_timeout=0.01)
+        logger._thread = object()
+        assert logger.record(SAMPLE_PAYLOAD, 0, 'v1')
+        assert not logger.record(SAMPLE_PAYLOAD, 1, 'v1')
+        assert logger.dropped == 1
+
+    def test_invalid_policy(self, tmp_path):
+        """Unknown buffer policies are rejected."""
+        with pytest.raises(ValueError):
+            AuditLogger(NDJSONSink(str(tmp_path)), policy='spill')
+
+    def test_parquet_sink(self, tmp_path):
+        """The columnar sink stores request fields as columns."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        logger = AuditLogger(ParquetSink(str(tmp_path)))
+        logger.record(SAMPLE_PAYLOAD, 42, 'v1')
+        logger.record(dict(SAMPLE_PAYLOAD, temperature='hot'), 0, 'v1')
+        logger.close()
+
+        path, = glob.glob(os.path.join(str(tmp_path), '*.parquet'))
+        table = pq.read_table(path).to_pydict()
+        assert table['output'] == [42, 0]
+        assert table['temperature'] == [28.0, None]
+        assert table['month'] == ['Jul', 'Jul']
+
+    def test_parquet_files_readable_after_flush(self, tmp_path):
+        """Parquet files older than max_seconds are finalised on flush."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        logger = AuditLogger(ParquetSink(str(tmp_path), max_seconds=0))
+        logger._thread = object()
+        logger.record(SAMPLE_PAYLOAD, 1, 'v1')
+        logger.flush()
+        logger.record(SAMPLE_PAYLOAD, 2, 'v1')
+        logger.flush()
+
+        # Without close(), as after a crash, every flushed record is readable
+        paths = sorted(glob.glob(os.path.join(str(tmp_path), '*.parquet')))
+        outputs = [pq.read_table(p).to_pydict()['output'] for p in paths]
+        assert outputs == [[1], [2]]
+
+    def test_parquet_files_rotate_under_sustained_load(self, tmp_path):
+        """Files are finalised by age even while the buffer never empties."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        sink = ParquetSink(str(tmp_path), max_seconds=0)
+        logger = AuditLogger(sink, batch_size=2)
+        logger._thread = object()
+        write = sink.write
+        writes = []
+
+        def write_and_refill(records):
+            write(records)
+            writes.append(len(records))
+            # Producers keep pace with the writer for a few batches
+            if len(writes) < 5:
+                for i in range(2):
+                    logger.record(SAMPLE_PAYLOAD, i, 'v1')
+
+        sink.write = write_and_refill
+        logger.record(SAMPLE_PAYLOAD, 0, 'v1')
+        logger.record(SAMPLE_PAYLOAD, 1, 'v1')
+        logger.flush()
+
+        assert writes == [2] * 5
+        paths = glob.glob(os.path.join(str(tmp_path), '*.parquet'))
+        assert len(paths) == 5
+        assert all(len(pq.read_table(p)) == 2 for p in paths)
+
+    def test_parquet_survives_non_object_payload(self, tmp_path, monkeypatch):
+        """A list naming every field cannot wipe out a batch of good records."""
+        pq = pytest.importorskip('pyarrow.parquet')
+        import app as app_module
+        logger = AuditLogger(ParquetSink(str(tmp_path)))
+        logger._thread = object()  # flush by hand so all records share a batch
+        monkeypatch.setattr(app_module, 'audit_logger', logger)
+
+        app_module.app.config['TESTING'] = True
+        with app_module.app.test_client() as client:
+            for _ in range(5):
+                assert client.post('/predict', json=SAMPLE_PAYLOAD).status_code == 200
+            bad = ['year', 'temperature', 'humidity', 'windspeed',
+                   'season', 'month', 'weather', 'weekday']
+            client.post('/predict', json=bad)
+            for _ in range(5):
+                assert client.post('/predict', json=SAMPLE_PAYLOAD).status_code == 200
+        logger.flush()
+        logger.sink.close()
+
+        path, = glob.glob(os.path.join(str(tmp_path), '*.parquet'))
+        table = pq.read_table(path).to_pydict()
+        assert logger.dropped == 0
+        assert len(table['output']) == 11
+        assert table['raw_input'][5] == json.dumps(bad)
+        assert table['month'][5] is None and table['month'][0] == 'Jul'
+        assert table['raw_input'][0] is None
+
+    def test_dropped_count_is_exact_under_contention(self, tmp_path):
+        """Concurrent drops are all counted."""
+        logger = AuditLogger(NDJSONSink(str(tmp_path)), capacity=0, policy='drop')
+        logger._thread = object()
+
+        def drop_many():
+            for i in range(5000):
+                logger.record(SAMPLE_PAYLOAD, i, 'v1')
+
+        threads = [threading.Thread(target=drop_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert logger.dropped == 40000
+
+    def test_record_does_no_io(self, tmp_path):
+        """The request path only buffers; writing is left to the writer thread.
+
+        Per-call overhead is measured by benchmark.py rather than asserted here.
+        """
+        sink = NDJSONSink(str(tmp_path))
+        logger = AuditLogger(sink, batch_size=10)
+        logger._thread = object()
+        writes = []
+        sink.write = writes.append
+        for i in range(100):
+            logger.record(SAMPLE_PAYLOAD, i, 'v1')
+        assert writes == []
+        assert logger.stats()['buffered'] == 100
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,110 @@
+import pytest
+import subprocess
+import sys
+import os
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import BikeSharingPredictor
+from backends import LinearBackend, TreeEnsembleBackend
+from train import TREE_FEATURES, compile_gradient_boosting, train
+from benchmark import SAMPLE_PAYLOAD
+
+@pytest.fixture(scope='module')
+def fitted():
+    """A small gradient-boosted model on synthetic data with a nonlinearity."""
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (400, len(TREE_FEATURES)))
+    y = 4000 * np.sin(3 * X[:, 3]) + 1500 * X[:, 0] + rng.normal(0, 50, 400)
+    model = GradientBoostingRegressor(n_estimators=40, max_depth=4, random_state=0)
+    model.fit(X, y)
+    return model, rng.uniform(-0.2, 1.2, (1000, len(TREE_FEATURES)))
+
+class TestTreeEnsembleBackend:
+    """Test cases for the array-compiled tree ensemble."""
+
+    def test_matches_sklearn(self, fitted):
+        """Compiled evaluation reproduces scikit-learn's predictions."""
+        model, X = fitted
+        backend = compile_gradient_boosting(model, TREE_FEATURES)
+        np.testing.assert_allclose(backend.predict_batch(X), model.predict(X), rtol=1e-9)
+        assert backend.max_depth == 4
+        assert len(backend.roots) == 40
+
+    def test_chunked_evaluation(self, fitted, monkeypatch):
+        """Large batches evaluated in chunks give the same results."""
+        model, X = fitted
+        backend = compile_gradient_boosting(model, TREE_FEATURES)
+        expected = backend.predict_batch(X)
+        monkeypatch.setattr(TreeEnsembleBackend, 'CHUNK_NODES', 100)
+        np.testing.assert_array_equal(backend.predict_batch(X), expected)
+
+    def test_save_and_load(self, fitted, tmp_path):
+        """An ensemble round-trips through its .npz file."""
+        model, X = fitted
+        backend = compile_gradient_boosting(model, TREE_FEATURES)
+        path = str(tmp_path / 'trees.npz')
+        backend.save(path)
+
+        loaded = TreeEnsembleBackend.load(path)
+        assert loaded.version == backend.version
+        assert loaded.feature_columns == TREE_FEATURES
+        np.testing.assert_array_equal(loaded.predict_batch(X), backend.predict_batch(X))
+
+    def test_serving_does_not_import_sklearn(self):
+        """The backends module works without the training library."""
+        code = 'import sys, backends; assert "sklearn" not in sys.modules'
+        subprocess.run([sys.executable, '-c', code], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+
+class TestPredictorBackends:
+    """Test cases for BikeSharingPredictor with pluggable backends."""
+
+    def test_linear_batch_matches_single(self):
+        """Batch predictions equal one-at-a-time predictions."""
+        predictor = BikeSharingPredictor()
+        assert isinstance(predictor.backend, LinearBackend)
+        records = [dict(SAMPLE_PAYLOAD, temperature=t, month=m)
+                   for t in np.linspace(-10, 40, 51)
+                   for m in ('Jan', 'Jun', 'Jul', 'Aug', 'Oct')]
+        batch = predictor.predict_batch(records)
+        assert batch.tolist() == [predictor.predict(r) for r in records]
+
+    def test_tree_backend(self, fitted):
+        """A tree ensemble can serve predictions through the predictor."""
+        model, _ = fitted
+        predictor = BikeSharingPredictor(backend=compile_gradient_boosting(model, TREE_FEATURES))
+        assert predictor.version.startswith('trees-')
+
+        prediction = predictor.predict(SAMPLE_PAYLOAD)
+        assert isinstance(prediction, int)
+        assert predictor.predict_batch([SAMPLE_PAYLOAD]).tolist() == [prediction]
+
+        # Only linear models are published for client-side scoring
+        assert predictor.export()['type'] == 'tree_ensemble'
+
+    def test_model_path_env(self, fitted, tmp_path, monkeypatch):
+        """BIKE_MODEL_PATH selects a compiled ensemble."""
+        model, _ = fitted
+        path = str(tmp_path / 'trees.npz')
+        compile_gradient_boosting(model, TREE_FEATURES).save(path)
+        monkeypatch.setenv('BIKE_MODEL_PATH', path)
+        assert isinstance(BikeSharingPredictor().backend, TreeEnsembleBackend)
+
+class TestTraining:
+    """Test cases for the training pipeline."""
+
+    def test_train_on_day_csv(self, day_csv):
+        """Training compiles a model equivalent to the fitted ensemble."""
+        model, backend, r2 = train(day_csv, n_estimators=20, max_depth=2)
+        assert backend.feature_columns == TREE_FEATURES
+        assert isinstance(r2, float)
+
+        X = np.random.default_rng(1).uniform(0, 1, (50, len(TREE_FEATURES)))
+        np.testing.assert_allclose(backend.predict_batch(X), model.predict(X), rtol=1e-9)
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,143 @@
+import pytest
+import sys
+import os
+import itertools
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import BikeSharingPredictor
+from backends import CompactLinearBackend, TreeEnsembleBackend
+from dataset import MONTHS, SEASONS, WEATHERS, WEEKDAYS
+
+# Every combination of the categorical request fields: 8064 rows
+GRID = [
+    dict(zip(('year', 'season', 'month', 'weather', 'weekday', 'holiday', 'workingday'), values))
+    for values in itertools.product(
+        (0, 1), SEASONS, MONTHS, WEATHERS, WEEKDAYS, (0, 1), (0, 1)
+    )
+]
+
+@pytest.fixture(scope='module')
+def reference():
+    return BikeSharingPredictor(compact=False)
+
+@pytest.fixture(scope='module')
+def compact():
+    return BikeSharingPredictor(compact=True)
+
+def with_numerics(rng, temperature=(-10, 45), humidity=(0, 100), windspeed=(0, 60)):
+    """The categorical grid with random numeric fields"""
+    return [
+        dict(record,
+             temperature=float(rng.uniform(*temperature)),
+             humidity=float(rng.uniform(*humidity)),
+             windspeed=float(rng.uniform(*windspeed)))
+        for record in GRID
+    ]
+
+def near_half(predictor, records, offsets):
+    """Move each record's temperature so its prediction lands near k + 0.5"""
+    backend = predictor.backend
+    weight = backend.coefficients['temp'] / predictor.numeric_scaling['temp']
+    raw = backend.predict_batch(predictor.encode_batch(records)) / backend.output_scale
+    moved = []
+    for record, value, offset in zip(records, raw, offsets):
+        target = (np.floor(value * backend.output_scale) + 0.5 + offset) / backend.output_scale
+        moved.append(dict(record, temperature=record['temperature'] + (target - value) / weight))
+    return moved
+
+class TestCompactEquivalence:
+    """Compact float32/int8 predictions equal the float64 reference."""
+
+    @pytest.mark.parametrize('seed', range(8))
+    def test_categorical_grid_random_numerics(self, reference, compact, seed):
+        """Exhaustive categorical grid with uniform random numerics."""
+        records = with_numerics(np.random.default_rng(seed))
+        np.testing.assert_array_equal(
+            compact.predict_batch(records), reference.predict_batch(records)
+        )
+
+    def test_form_inputs(self, reference, compact):
+        """Values as typed into the web form (one decimal place)."""
+        rng = np.random.default_rng(100)
+        records = [
+            dict(record, temperature=round(r['temperature'], 1),
+                 humidity=round(r['humidity'], 1), windspeed=round(r['windspeed'], 1))
+            for record, r in zip(GRID, with_numerics(rng))
+        ]
+        np.testing.assert_array_equal(
+            compact.predict_batch(records), reference.predict_batch(records)
+        )
+
+    @pytest.mark.parametrize('scale', [1e-3, 1e-5, 0.0])
+    def test_rounding_boundaries(self, reference, compact, scale):
+        """Predictions within float32 noise of a half-integer fall back correctly."""
+        rng = np.random.default_rng(200)
+        records = near_half(reference, with_numerics(rng, temperature=(5, 40)),
+                            rng.uniform(-scale, scale, len(GRID)))
+        np.testing.assert_array_equal(
+            compact.predict_batch(records), reference.predict_batch(records)
+        )
+
+    def test_out_of_range_inputs(self, reference, compact):
+        """Inputs far outside the training range, including negatives and NaN."""
+        rng = np.random.default_rng(300)
+        records = with_numerics(rng, temperature=(-1e6, 1e6), humidity=(-500, 500),
+                                windspeed=(0, 1e4))
+        records += [dict(GRID[0], temperature=t, humidity=50.0, windspeed=5.0)
+                    for t in (1e12, -1e12, 1e-30, float('nan'))]
+        np.testing.assert_array_equal(
+            compact.predict_batch(records), reference.predict_batch(records)
+        )
+
+    @pytest.mark.parametrize('temperature', [1e18, 1e300, float('inf')])
+    def test_counts_out_of_range_rejected(self, reference, compact, temperature):
+        """Both paths reject counts int64 cannot hold instead of wrapping."""
+        records = [dict(GRID[0], temperature=temperature, humidity=50.0, windspeed=5.0)]
+        for predictor in (reference, compact):
+            with pytest.raises(ValueError):
+                predictor.predict_batch(records)
+
+    def test_error_bound_holds(self, reference, compact):
+        """Each float32 prediction is within error_bound() of the float64 one."""
+        records = with_numerics(np.random.default_rng(400), temperature=(-100, 100))
+        numeric, onehot = compact.encode_compact(records)
+        predictions = compact.compact.predict_batch(numeric, onehot).astype(np.float64)
+        expected = reference.backend.predict_batch(reference.encode_batch(records))
+        assert np.abs(predictions - expected).max() <= compact.compact.error_bound(numeric)
+
+class TestCompactMode:
+    """Test cases for enabling the compact inference path."""
+
+    def test_compact_storage(self, compact):
+        """Numeric features are float32 and one-hot features int8."""
+        numeric, onehot = compact.encode_compact(with_numerics(np.random.default_rng(0))[:10])
+        assert numeric.dtype == np.float32 and onehot.dtype == np.int8
+        assert isinstance(compact.compact, CompactLinearBackend)
+        assert numeric.shape[1] + onehot.shape[1] == len(compact.backend.feature_columns)
+        assert set(onehot.ravel()) <= {0, 1}
+
+    def test_environment_variable(self, monkeypatch):
+        """BIKE_COMPACT_INFERENCE=1 turns the compact path on."""
+        monkeypatch.delenv('BIKE_COMPACT_INFERENCE', raising=False)
+        assert BikeSharingPredictor().compact is None
+        monkeypatch.setenv('BIKE_COMPACT_INFERENCE', '1')
+        assert BikeSharingPredictor().compact is not None
+
+    def test_tree_backend_unaffected(self):
+        """Only linear models have a compact path."""
+        # A single leaf predicting 1000 bikes
+        trees = TreeEnsembleBackend([0], [0.0], [0], [0], [1000.0], [0],
+                                    base_score=0.0, max_depth=0, feature_columns=['temp'])
+        predictor = BikeSharingPredictor(backend=trees, compact=True)
+        assert predictor.compact is None
+        assert predictor.predict_batch(GRID[:3]).tolist() == [1000] * 3
+
+    def test_empty_batch(self, compact):
+        """An empty batch predicts nothing."""
+        assert compact.predict_batch([]).tolist() == []
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
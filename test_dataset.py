@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dataset
+from dataset import load_day, load_dataset, encode, design_columns
+
+def notebook_design(df):
+    """The notebook's get_dummies/concat/drop steps, for comparison."""
+    month = pd.get_dummies(df['mnth'], drop_first=True)
+    season = pd.get_dummies(df['season'], drop_first=True)
+    weather = pd.get_dummies(df['weathersit'], drop_first=True)
+    week = pd.get_dummies(df['weekday'], drop_first=True)
+    df = pd.concat([df, season, month, weather, week], axis=1)
+    df = df.drop(['mnth', 'weekday', 'season', 'weathersit'], axis=1)
+    return df.drop('cnt', axis=1), df['cnt']
+
+class TestEncoding:
+    """Test cases for the design matrix encoding."""
+
+    def test_matches_notebook(self, day_csv):
+        """Columns and values match the notebook's dummy expansion."""
+        df = load_day(day_csv)
+        expected_X, expected_y = notebook_design(df)
+        X, y = encode(df)
+
+        assert set(design_columns()) == set(expected_X.columns)
+        expected = expected_X[design_columns()].to_numpy(dtype=np.float64)
+        np.testing.assert_array_equal(X, expected)
+        np.testing.assert_array_equal(y, expected_y.to_numpy(dtype=np.float64))
+
+class TestDatasetCache:
+    """Test cases for the cached dataset loader."""
+
+    def test_second_load_is_memory_mapped(self, day_csv, dataset_cache, monkeypatch):
+        """Later loads reuse the cache without parsing the CSV."""
+        first = load_dataset(day_csv)
+        assert os.path.isdir(os.path.join(dataset_cache, first.key))
+
+        def fail(path=None):
+            raise AssertionError('day.csv was parsed again')
+        monkeypatch.setattr(dataset, 'load_day', fail)
+
+        second = load_dataset(day_csv)
+        assert isinstance(second.X, np.memmap)
+        assert second.key == first.key
+        np.testing.assert_array_equal(second.X, first.X)
+        assert second.columns == design_columns()
+        assert len(second) == 365
+
+    def test_frame_round_trip(self, day_csv):
+        """The cached frame has the same content as load_day()."""
+        frame = load_dataset(day_csv).frame
+        df = load_day(day_csv)
+        for column in frame.columns:
+            assert list(frame[column]) == list(df[column])
+
+    def test_invalidated_by_content_and_version(self, day_csv, monkeypatch):
+        """The cache key follows the file contents and encoding version."""
+        key = load_dataset(day_csv).key
+
+        monkeypatch.setattr(dataset, 'ENCODING_VERSION', dataset.ENCODING_VERSION + 1)
+        assert load_dataset(day_csv).key != key
+        monkeypatch.undo()
+
+        with open(day_csv, 'a', encoding='utf-8') as f:
+            f.write('9999,01-01-2019,1,1,1,0,1,1,1,10,10,50,10,1,1,2\n')
+        changed = load_dataset(day_csv)
+        assert changed.key != key
+        assert len(changed) == 366
+
+    def test_unwritable_cache(self, day_csv, tmp_path, monkeypatch):
+        """Without a writable cache the dataset is served from memory."""
+        blocker = tmp_path / 'not-a-directory'
+        blocker.write_text('')
+        monkeypatch.setattr(dataset, 'CACHE_DIR', str(blocker / 'cache'))
+
+        ds = load_dataset(day_csv)
+        assert len(ds) == 365
+        assert not isinstance(ds.X, np.memmap)
+        assert list(ds.frame['mnth']) == list(load_day(day_csv)['mnth'])
+
+        from drift import load_reference_profile
+        from stats import HistoricalStats
+        assert load_reference_profile(day_csv) is not None
+        assert HistoricalStats(day_csv).snapshot().rows == 365
+
+    def test_missing_file(self, tmp_path):
+        """A missing source file raises an OSError."""
+        with pytest.raises(OSError):
+            load_dataset(str(tmp_path / 'missing.csv'))
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,141 @@
+import pytest
+import sys
+import os
+import threading
+import time
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from drift import (
+    DriftMonitor, StreamingHistogram, CategoricalCounter,
+    load_reference_profile, PSI_DRIFT
+)
+
+def payload(**overrides):
+    data = {
+        'year': 1, 'month': 'Jul', 'weekday': 'Mon',
+        'temperature': 25.0, 'humidity': 60.0, 'windspeed': 10.0,
+        'weather': 'Clear', 'season': 'Summer',
+        'holiday': 0, 'workingday': 1
+    }
+    data.update(overrides)
+    return data
+
+class TestSketches:
+    """Test cases for the fixed-size sketches."""
+
+    def test_histogram_out_of_range_and_invalid(self):
+        """Out-of-range values go to edge bins, bad values are counted."""
+        hist = StreamingHistogram(0.0, 40.0, bins=4)
+        hist.update([-5, 0, 10, 40, 55, 'hot', None])
+
+        summary = hist.to_dict()
+        assert summary['underflow'] == 1
+        assert summary['overflow'] == 1
+        assert summary['invalid'] == 2
+        assert summary['histogram'] == [1, 1, 0, 1]
+        assert summary['min'] == -5 and summary['max'] == 55
+
+    def test_memory_is_constant(self):
+        """Sketch sizes do not grow with the number of observations."""
+        hist = StreamingHistogram(0.0, 40.0, bins=10)
+        counter = CategoricalCounter(('a', 'b'))
+        before = (hist.counts.nbytes, counter.counts.nbytes)
+
+        for i in range(50):
+            hist.update(np.random.uniform(-100, 100, 1000).tolist())
+            counter.update([f'value-{i}-{j}' for j in range(100)])
+
+        assert (hist.counts.nbytes, counter.counts.nbytes) == before
+        assert counter.to_dict()['frequencies']['__other__'] == 5000
+
+class TestDriftMonitor:
+    """Test cases for the drift monitor."""
+
+    def test_reference_profile_from_day_csv(self, day_csv):
+        """The reference profile is built from the training data."""
+        reference = load_reference_profile(day_csv)
+        assert reference is not None
+        assert reference['temperature'].total == 365
+        assert reference['month'].counts[-1] == 0  # no unknown months
+
+    def test_missing_reference(self, tmp_path):
+        """A missing day.csv disables drift scoring instead of failing."""
+        assert load_reference_profile(str(tmp_path / 'missing.csv')) is None
+        monitor = DriftMonitor(reference=None)
+        monitor.observe(payload())
+        monitor.flush()
+        report = monitor.report()
+        assert report['reference_available'] is False
+        assert 'psi' not in report['fields']['temperature']
+
+    def test_detects_humidity_as_fraction(self, day_csv):
+        """Humidity sent as a 0-1 fraction is flagged as drift."""
+        monitor = DriftMonitor(reference=load_reference_profile(day_csv))
+        for i in range(200):
+            monitor.observe(payload(humidity=0.3 + i / 1000, temperature=10 + i % 20))
+        monitor.flush()
+
+        fields = monitor.report()['fields']
+        assert fields['humidity']['psi'] >= PSI_DRIFT
+        assert fields['humidity']['status'] == 'drift'
+        assert fields['temperature']['live']['count'] == 200
+
+    def test_full_queue_drops_samples(self):
+        """A full pending queue sheds samples rather than blocking."""
+        monitor = DriftMonitor(max_pending=1)
+        monitor._thread = object()  # keep the background updater stopped
+        monitor.observe(payload())
+        monitor.observe(payload())
+        assert monitor.dropped == 1
+
+    def test_dropped_count_is_exact_under_contention(self):
+        """Concurrent drops are all counted."""
+        monitor = DriftMonitor(max_pending=1)
+        monitor._thread = object()
+        monitor.observe(payload())
+
+        def drop_many():
+            for _ in range(5000):
+                monitor.observe(payload())
+
+        threads = [threading.Thread(target=drop_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert monitor.dropped == 40000
+
+    def test_ignores_non_object_payloads(self):
+        """Payloads that are not JSON objects are not queued."""
+        monitor = DriftMonitor()
+        monitor._thread = object()  # keep the background updater stopped
+        monitor.observe('year temperature humidity windspeed season month weather weekday')
+        monitor.observe(['year', 'temperature'])
+        assert monitor.report()['pending'] == 0
+
+    def test_failed_batch_does_not_stop_updater(self, monkeypatch):
+        """The background updater keeps running after a batch fails."""
+        monitor = DriftMonitor(batch_size=1)
+        apply = monitor._apply
+        failures = []
+
+        def flaky(batch):
+            if not failures:
+                failures.append(batch)
+                raise AttributeError('bad batch')
+            apply(batch)
+
+        monkeypatch.setattr(monitor, '_apply', flaky)
+        monitor.observe(payload())
+        monitor.observe(payload())
+        deadline = time.monotonic() + 5
+        while monitor.report()['fields']['temperature']['live']['count'] < 1:
+            assert time.monotonic() < deadline, 'drift monitor stopped updating'
+            time.sleep(0.01)
+        assert len(failures) == 1 and monitor._thread.is_alive()
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,122 @@
+import pytest
+import json
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import predictor
+from replay import load_capture, capture, schedule, replay, verify, summarize, main
+from benchmark import SAMPLE_PAYLOAD
+
+@pytest.fixture
+def capture_file(tmp_path):
+    """Write a capture file in the audit log layout."""
+    path = tmp_path / 'requests.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(6):
+            payload = dict(SAMPLE_PAYLOAD, temperature=10.0 + i)
+            f.write(json.dumps({
+                'timestamp': 1000.0 + i * 0.01,
+                'input': payload,
+                'output': predictor.predict(payload),
+                'model_version': predictor.version,
+            }) + '\n')
+    return str(path)
+
+class TestReplay:
+    """Test cases for the capture and replay tool."""
+
+    def test_load_capture_accepts_bare_payloads(self, tmp_path):
+        """Lines without an "input" key are treated as payloads."""
+        path = tmp_path / 'bare.jsonl'
+        path.write_text(json.dumps(SAMPLE_PAYLOAD) + '\n\n')
+        records = load_capture(str(path))
+        assert records == [{'input': SAMPLE_PAYLOAD}]
+
+    def test_capture_merges_in_time_order(self, tmp_path):
+        """Audit files are merged into one capture ordered by timestamp."""
+        audit_dir = tmp_path / 'audit'
+        audit_dir.mkdir()
+        (audit_dir / 'b.ndjson').write_text(json.dumps({'timestamp': 2, 'input': {}}) + '\n')
+        (audit_dir / 'a.ndjson').write_text(json.dumps({'timestamp': 3, 'input': {}}) + '\n'
+                                            + json.dumps({'timestamp': 1, 'input': {}}) + '\n')
+        output = str(tmp_path / 'requests.jsonl')
+
+        assert capture([str(audit_dir)], output) == 3
+        assert [r['timestamp'] for r in load_capture(output)] == [1, 2, 3]
+
+    def test_capture_reads_parquet_audit_logs(self, tmp_path):
+        """Directories written by the Parquet audit sink can be captured."""
+        pytest.importorskip('pyarrow')
+        from audit import AuditLogger, ParquetSink
+        audit_dir = str(tmp_path / 'audit')
+        logger = AuditLogger(ParquetSink(audit_dir))
+        logger.record(SAMPLE_PAYLOAD, predictor.predict(SAMPLE_PAYLOAD), predictor.version)
+        logger.record(['year', 'month'], 0, predictor.version)
+        logger.close()
+        output = str(tmp_path / 'requests.jsonl')
+
+        assert capture([audit_dir], output) == 2
+        records = load_capture(output)
+        assert records[0]['input'] == SAMPLE_PAYLOAD
+        assert records[1]['input'] == ['year', 'month']
+        results, _ = replay(records[:1], rate=0)
+        assert verify(records[:1], results) == []
+
+    def test_capture_rejects_directory_without_logs(self, tmp_path, capsys):
+        """A directory holding no audit logs is an error, not an empty capture."""
+        (tmp_path / 'notes.txt').write_text('')
+        with pytest.raises(ValueError):
+            capture([str(tmp_path)], str(tmp_path / 'requests.jsonl'))
+        assert main(['capture', str(tmp_path), '-o', str(tmp_path / 'out.jsonl')]) == 1
+        assert 'No audit log files' in capsys.readouterr().out
+
+    def test_schedule_rate(self):
+        """The rate multiplier compresses the original inter-arrival times."""
+        records = [{'timestamp': 10.0}, {'timestamp': 11.0}, {'timestamp': 14.0}]
+        assert schedule(records, 2.0) == [0.0, 0.5, 2.0]
+        assert schedule(records, 0) == [0.0, 0.0, 0.0]
+        assert schedule([{'input': {}}], 1.0) == [0.0]
+
+    def test_replay_sharded(self, capture_file):
+        """Replay across worker processes matches the captured outputs."""
+        records = load_capture(capture_file)
+        results, elapsed = replay(records, rate=1.0, workers=2, threads=2)
+
+        assert all(r['status'] == 200 for r in results)
+        assert verify(records, results) == []
+
+        summary = summarize(results, elapsed)
+        assert summary['requests'] == 6
+        assert summary['latency_p99_ms'] >= summary['latency_p50_ms']
+
+    def test_verify_against_baseline(self, capture_file):
+        """Responses that differ from a baseline run are reported."""
+        records = load_capture(capture_file)
+        results, _ = replay(records, rate=0)
+        baseline = [dict(r) for r in results]
+        assert verify(records, results, baseline) == []
+
+        baseline[3]['digest'] = 'changed'
+        assert verify(records, results, baseline) == [3]
+
+    def test_cli_round_trip(self, capture_file, tmp_path):
+        """The run command saves results and compares against them."""
+        saved = str(tmp_path / 'baseline.jsonl')
+        assert main(['run', capture_file, '--rate', '0', '--workers', '1',
+                     '--save', saved]) == 0
+        assert main(['run', capture_file, '--rate', '0', '--workers', '1',
+                     '--compare', saved]) == 0
+
+    def test_empty_capture(self, tmp_path, capsys):
+        """An empty capture replays zero requests instead of failing."""
+        path = tmp_path / 'empty.jsonl'
+        path.write_text('')
+        assert schedule([]) == []
+        assert main(['run', str(path), '--workers', '2']) == 0
+        assert '"requests": 0' in capsys.readouterr().out
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,169 @@
+import pytest
+import json
+import sys
+import os
+import threading
+import time
+import numpy as np
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from dataset import load_day
+import stats as stats_module
+from stats import HistoricalStats, STATISTICS
+
+def wait_for_rebuild(stats, previous, timeout=5):
+    """Poll snapshot() until a background rebuild replaces previous."""
+    deadline = time.monotonic() + timeout
+    while stats.snapshot() is previous:
+        assert time.monotonic() < deadline, 'snapshot was not rebuilt'
+        time.sleep(0.01)
+    return stats.snapshot()
+
+def append_row(path):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f'9999,01-01-2019,1,1,1,0,1,1,1,10,10,50,10,1,1,{10 ** 6}\n')
+
+@pytest.fixture
+def stats_client(day_csv, monkeypatch):
+    """Test client serving aggregates built from the synthetic day.csv."""
+    monkeypatch.setattr(app_module, 'historical_stats', HistoricalStats(day_csv))
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application."""
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+class TestHistoricalStats:
+    """Test cases for the precomputed aggregates."""
+
+    def test_aggregates_match_pandas(self, day_csv):
+        """Precomputed values agree with a pandas groupby."""
+        snapshot = HistoricalStats(day_csv).snapshot()
+        df = load_day(day_csv)
+
+        season = snapshot.aggregates['season']
+        assert season.shape == (4, 3, len(STATISTICS))
+
+        expected = df[df['yr'] == 1].groupby('season')['cnt']
+        fall = season[2, 1]  # Fall, yr == 1
+        assert fall[0] == expected.count()['Fall']
+        assert np.isclose(fall[1], expected.mean()['Fall'])
+        assert np.isclose(fall[4], expected.median()['Fall'])
+
+        # The "all" slice covers every row
+        assert season[:, 2, 0].sum() == len(df)
+
+    def test_missing_file(self, tmp_path):
+        """No snapshot is available without data."""
+        assert HistoricalStats(str(tmp_path / 'missing.csv')).snapshot() is None
+
+    def test_rebuilds_on_change(self, day_csv):
+        """A changed source file is picked up on the next check."""
+        stats = HistoricalStats(day_csv, check_interval=0)
+        first = stats.snapshot()
+        stats.refresh()
+        assert stats.snapshot() is first
+
+        append_row(day_csv)
+        second = wait_for_rebuild(stats, first)
+        assert second.rows == first.rows + 1
+        assert second.etag != first.etag
+
+    def test_failed_rebuild_keeps_snapshot_and_retries(self, day_csv, monkeypatch):
+        """A broken edit keeps the last good snapshot and is retried."""
+        stats = HistoricalStats(day_csv, check_interval=60)
+        first = stats.snapshot()
+        with open(day_csv, encoding='utf-8') as f:
+            original = f.read()
+        with open(day_csv, 'w', encoding='utf-8') as f:
+            f.write(original.replace('cnt', 'count', 1))  # no target column
+
+        calls = []
+        load = stats_module.load_dataset
+        monkeypatch.setattr(stats_module, 'load_dataset', lambda *a: calls.append(a) or load(*a))
+        stats.refresh()
+        stats.refresh()
+        assert stats.snapshot() is first
+        assert len(calls) == 2  # not remembered as seen, so checked again
+
+        with open(day_csv, 'w', encoding='utf-8') as f:
+            f.write(original)
+        append_row(day_csv)
+        stats.refresh()
+        assert stats.snapshot().rows == first.rows + 1
+
+    def test_built_at_startup(self, day_csv, monkeypatch):
+        """Aggregates are computed on construction, not by the first request."""
+        calls = []
+        load = stats_module.load_dataset
+        monkeypatch.setattr(stats_module, 'load_dataset', lambda *a: calls.append(a) or load(*a))
+        stats = HistoricalStats(day_csv, check_interval=60)
+        assert len(calls) == 1
+        assert stats.snapshot() is not None
+        assert len(calls) == 1
+
+    def test_rebuild_does_not_block_readers(self, day_csv, monkeypatch):
+        """While a rebuild runs, requests get the previous snapshot at once."""
+        stats = HistoricalStats(day_csv, check_interval=0)
+        first = stats.snapshot()
+        started, release = threading.Event(), threading.Event()
+        compute = stats_module.compute_aggregates
+
+        def slow_compute(df):
+            started.set()
+            release.wait(5)
+            return compute(df)
+
+        monkeypatch.setattr(stats_module, 'compute_aggregates', slow_compute)
+        append_row(day_csv)
+        assert stats.snapshot() is first
+        assert started.wait(5)
+        assert stats.snapshot() is first  # rebuild still in progress
+        release.set()
+        assert wait_for_rebuild(stats, first).rows == first.rows + 1
+
+class TestStatsEndpoint:
+    """Test cases for the /stats endpoint."""
+
+    def test_stats_route(self, stats_client):
+        """All groups are returned with their layout."""
+        response = stats_client.get('/stats')
+        assert response.status_code == 200
+
+        data = json.loads(response.data)
+        assert data['rows'] == 365
+        assert data['groups']['month']['categories'][0] == 'Jan'
+        assert data['groups']['weather']['statistics'] == list(STATISTICS)
+
+    def test_conditional_request(self, stats_client):
+        """A matching ETag returns 304 without a body."""
+        etag = stats_client.get('/stats').headers['ETag']
+        response = stats_client.get('/stats', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_single_group(self, stats_client):
+        """A single group can be requested on its own."""
+        response = stats_client.get('/stats/weekday')
+        assert response.status_code == 200
+        assert json.loads(response.data)['group'] == 'weekday'
+
+        assert stats_client.get('/stats/colour').status_code == 404
+
+    def test_unavailable(self, tmp_path, monkeypatch, client):
+        """Without data the endpoint reports 503."""
+        monkeypatch.setattr(app_module, 'historical_stats',
+                            HistoricalStats(str(tmp_path / 'missing.csv')))
+        response = client.get('/stats')
+        assert response.status_code == 503
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Train a gradient-boosted tree model on day.csv and compile it for serving
+
+The fitted scikit-learn ensemble is converted into flat NumPy arrays
+(backends.TreeEnsembleBackend) and saved as .npz, so the web app can load it
+via BIKE_MODEL_PATH without scikit-learn.
+
+    python train.py --output models/tree_ensemble.npz
+"""
+
+import argparse
+import os
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
+
+from backends import TreeEnsembleBackend
+from dataset import FEATURE_SCALING, load_dataset
+
+# Design matrix columns the app can encode from a request. atemp is left out
+# because requests only carry one temperature.
+TREE_FEATURES = [
+    'yr', 'holiday', 'workingday', 'temp', 'hum', 'windspeed',
+    'Spring', 'Summer', 'Winter',
+    'Aug', 'Dec', 'Feb', 'Jan', 'Jul', 'Jun', 'Mar', 'May', 'Nov', 'Oct', 'Sep',
+    'Light_rainfall', 'Thunderstrom',
+    'Mon', 'Sat', 'Sun', 'Thurs', 'Tue', 'Wed',
+]
+
+
+def training_matrix(ds, features=TREE_FEATURES):
+    """Select and scale design matrix columns the way the app encodes requests"""
+    X = np.array(ds.X[:, [ds.columns.index(f) for f in features]])
+    for j, feature in enumerate(features):
+        if feature in FEATURE_SCALING:
+            X[:, j] /= FEATURE_SCALING[feature]
+    return X, np.asarray(ds.y)
+
+
+def compile_gradient_boosting(model, feature_columns):
+    """Convert a fitted GradientBoostingRegressor into a TreeEnsembleBackend"""
+    if model.init_ == 'zero':
+        base_score = 0.0
+    else:
+        base_score = float(model.init_.predict(np.zeros((1, len(feature_columns))))[0])
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_[:, 0]:
+        tree = estimator.tree_
+        count = tree.node_count
+        is_leaf = tree.children_left == -1
+        index = np.arange(count) + offset
+
+        roots.append(offset)
+        # Leaves loop back to themselves so evaluation can run a fixed depth
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+        left.append(np.where(is_leaf, index, tree.children_left + offset))
+        right.append(np.where(is_leaf, index, tree.children_right + offset))
+        value.append(np.where(is_leaf, model.learning_rate * tree.value[:, 0, 0], 0.0))
+        offset += count
+
+    return TreeEnsembleBackend(
+        np.concatenate(feature), np.concatenate(threshold),
+        np.concatenate(left), np.concatenate(right),
+        np.concatenate(value), np.array(roots),
+        base_score=base_score,
+        max_depth=max(e.tree_.max_depth for e in model.estimators_[:, 0]),
+        feature_columns=feature_columns,
+    )
+
+
+def train(path=None, n_estimators=300, max_depth=3, learning_rate=0.05):
+    """Fit on the notebook's 70/30 split; returns (model, backend, test r2)"""
+    X, y = training_matrix(load_dataset(path))
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, train_size=0.7, random_state=80
+    )
+    model = GradientBoostingRegressor(
+        n_estimators=n_estimators, max_depth=max_depth,
+        learning_rate=learning_rate, random_state=80
+    )
+    model.fit(X_train, y_train)
+    backend = compile_gradient_boosting(model, TREE_FEATURES)
+    return model, backend, r2_score(y_test, backend.predict_batch(X_test))
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data', help='path to day.csv')
+    parser.add_argument('--output', default=os.path.join('models', 'tree_ensemble.npz'))
+    parser.add_argument('--n-estimators', type=int, default=300)
+    parser.add_argument('--max-depth', type=int, default=3)
+    parser.add_argument('--learning-rate', type=float, default=0.05)
+    args = parser.parse_args()
+
+    _, backend, r2 = train(args.data, args.n_estimators, args.max_depth, args.learning_rate)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    backend.save(args.output)
+    print(f"✅ Saved {backend.version} to {args.output} (test R² = {r2:.3f})")
+    print(f"   Serve it with BIKE_MODEL_PATH={args.output}")
+
+
+if __name__ == '__main__':
+    main()